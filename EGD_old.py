@@ -9,6 +9,11 @@ from typing import overload, Iterable
 
 import pygame as pg
 
+try:
+    import numpy as np  # Optional: only GraphPlot(vectorized=True) needs it
+except ImportError:
+    np = None
+
 
 class Settings:
     FPS = 60
@@ -731,11 +736,15 @@ class GraphLine(AbstractGraph):
 
 
 class GraphPlot(AbstractGraph):
-    def __init__(self, display: Display, function, step=100, static: bool = False, maxSize: int = 100, color: str = None):
+    def __init__(self, display: Display, function, step=100, static: bool = False, maxSize: int = 100, color: str = None,
+                 vectorized: bool = False):
         super().__init__(display)
         self.step = step
         self.function = function
         self.static = static
+        # function gets a whole numpy array of x values; falls back to per-point calls without numpy
+        self.vectorized = vectorized and np is not None
+        self._cache = None
         if static:
             self.values = {}
             self.mSize = maxSize
@@ -747,6 +756,48 @@ class GraphPlot(AbstractGraph):
         self.color = color
 
     def draw_me(self):
+        if self.vectorized:
+            try:
+                return self.draw_vectorized()
+            except (TypeError, ValueError):
+                self.vectorized = False  # function can't take arrays (e.g. `if x >= 0`)
+        self.draw_pointwise()
+
+    def evaluate(self, first, last):
+        # y for x = first/step .. last/step; NaN where the function is undefined
+        if self.static and self._cache and self._cache[0] <= first and last < self._cache[0] + len(self._cache[1]):
+            return self._cache[1][first - self._cache[0]:last - self._cache[0] + 1]
+
+        xs = np.arange(first, last + 1) / self.step
+        with np.errstate(all="ignore"):
+            ys = np.asarray(self.function(xs), dtype=float)
+        ys = np.where(np.isfinite(ys), ys, np.nan) if ys.shape else np.full(xs.shape, ys if np.isfinite(ys) else np.nan)
+        if self.static: self._cache = first, ys
+        return ys
+
+    def draw_vectorized(self):
+        first = int(self.restoreSmoothX(0) * self.step)
+        last = ceil(self.restoreSmoothX(self.display.surface.get_width()) * self.step)
+        ys = self.evaluate(first, last)
+
+        valid = ~np.isnan(ys)
+        edges = np.diff(np.concatenate(([0], valid.view(np.int8), [0])))
+        starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+        if not len(starts): return
+
+        limit = 16 * max(self.display.surface.get_size())  # pygame takes ints; far off-screen points are clipped
+        screen_x = np.clip(self.transformX(np.arange(first, last + 1) / self.step), -limit, limit)
+        screen_y = np.clip(self.transformY(np.nan_to_num(ys)), -limit, limit)
+        points = np.column_stack((screen_x, screen_y))
+
+        # One pg.draw.lines per continuous run; gaps are marked with dots like in draw_pointwise
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            run = points[start:end].tolist()
+            if len(run) > 1: pg.draw.lines(self.display.surface, self.color, False, run, 2)
+            if start > 0: pg.draw.circle(self.display.surface, self.color, run[0], 3)
+            if end < len(ys): pg.draw.circle(self.display.surface, self.color, run[-1], 3)
+
+    def draw_pointwise(self):
         prev = None
         left_edge = self.restoreSmoothX(0)
         right_edge = self.restoreSmoothX(self.display.surface.get_width())
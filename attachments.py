@@ -0,0 +1,161 @@
+import os
+import json
+import stat
+import shutil
+import hashlib
+import threading
+
+import convert
+from config import blob_folder
+from disk import anchored, atomic_file, atomic_path
+from web import background, download
+
+blob_path = anchored(blob_folder)
+index_path = os.path.join(blob_path, "index.json")
+read_only = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH  # Ссылки на блоб общие - правка одной испортит все
+
+_lock = threading.Lock()
+_in_flight = {}  # Ссылка -> Future уже идущей загрузки: второй запрос того же файла ждёт первый
+
+
+def _load_index():
+    try:
+        with open(index_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _remember(file_url, digest, content_type):
+    # Индекс перечитывается под замком: его могли обновить соседние потоки
+    with _lock:
+        index = _load_index()
+        index[file_url] = {"hash": digest, "type": content_type}
+        with atomic_file(index_path, 'w', encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, indent=1)
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def blob(digest):
+    return os.path.join(blob_path, digest)
+
+
+def known(file_url):
+    # (хэш, Content-Type) уже скачанного файла или None
+    entry = _load_index().get(file_url)
+    if entry and os.path.exists(blob(entry["hash"])):
+        return entry["hash"], entry["type"]
+    return None
+
+
+def fetch(file_url, headers=None):
+    # Возвращает (хэш, Content-Type); файл, который уже есть в хранилище, заново не качается
+    cached = known(file_url)
+    if cached: return cached
+
+    with _lock:
+        running = _in_flight.get(file_url)
+        if running is None:
+            from concurrent.futures import Future
+            _in_flight[file_url] = future = Future()
+    if running is not None:
+        return running.result()
+
+    try:
+        result = _store(file_url, headers)
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _lock:
+            del _in_flight[file_url]
+
+
+def _store(file_url, headers):
+    # Качает файл и кладёт его в хранилище под хэшем содержимого
+    os.makedirs(blob_path, exist_ok=True)
+    staged = os.path.join(blob_path, hashlib.sha1(file_url.encode("utf-8")).hexdigest() + ".download")
+    content_type = download(file_url, staged, headers)
+    digest = _file_hash(staged)
+
+    if os.path.exists(blob(digest)):
+        os.remove(staged)  # Тот же файл по другой ссылке - храним один раз
+    else:
+        os.chmod(staged, read_only)
+        os.replace(staged, blob(digest))
+
+    _remember(file_url, digest, content_type)
+    return digest, content_type
+
+
+def fetch_all(urls, headers=None):
+    # Возвращает {url: Future[(хэш, Content-Type)]}, файлы качаются в фоне
+    return background(fetch, urls, headers)
+
+
+def converted(digest, extension):
+    # (ключ .npy-версии файла из хранилища, шапка) - переводится один раз на все задачи;
+    # None - в файле не таблица чисел
+    base = f"{digest}.v{convert.version}"
+    key, header_key, not_table = base + ".npy", base + ".header.json", base + ".not-table"
+    if os.path.exists(blob(key)):
+        try:
+            with open(blob(header_key), encoding="utf-8") as f:
+                return key, json.load(f)
+        except (OSError, ValueError):
+            return key, []
+    if os.path.exists(blob(not_table)): return None
+
+    header = convert.to_npy(blob(digest), blob(key), extension)
+    if header is None:
+        open(blob(not_table), 'w').close()
+        return None
+    if header:
+        with atomic_file(blob(header_key), 'w', encoding="utf-8") as f:
+            json.dump(header, f)
+    os.chmod(blob(key), read_only)
+    return key, header
+
+
+def is_linked(digest, path):
+    try:
+        return os.path.samefile(blob(digest), path)
+    except OSError:
+        return False
+
+
+def _unprotect(path):
+    # На Windows os.replace не перезаписывает файл "только для чтения", а у жёсткой ссылки этот атрибут общий
+    # с блобом. Старую ссылку на время делаем записываемой; возвращает блоб, которому её потом вернуть
+    try:
+        mode = os.stat(path).st_mode
+    except OSError:
+        return None
+    if mode & stat.S_IWUSR: return None
+
+    os.chmod(path, mode | stat.S_IWUSR)
+    old = blob(_file_hash(path))
+    return old if os.path.exists(old) and os.path.samefile(old, path) else None
+
+
+def link(digest, path):
+    # Кладёт файл из хранилища в path жёсткой ссылкой (или копией, если ссылки не поддерживаются)
+    if is_linked(digest, path): return
+    old = _unprotect(path)
+    try:
+        with atomic_path(path) as temp:
+            try:
+                os.link(blob(digest), temp)
+            except OSError:
+                shutil.copyfile(blob(digest), temp)
+    finally:
+        if old: os.chmod(old, read_only)
@@ -1,21 +1,29 @@
+import io
 import os
 import re
 import textwrap
+from functools import partial
 
-import requests
 import mimetypes
-from bs4 import BeautifulSoup
-
 from config import *
+import attachments
+import convert
+import manifest
+import web
+from extract import sensible_text
+from tracing import span, finish
 
 headers = {
     "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/51.0.2704.103 "
                   "Safari/537.36 "
 }
 
+downloads = {}  # Ссылка на файл -> Future[(хэш, Content-Type)], качаются в фоне
+
 
-def sensible_text(nonsense_text: str):
-    return re.sub(r'[^a-zA-Zа-яА-Я0-9ёЁ.\-+=?!/\\ ]', '', nonsense_text)
+def ask(question, answer=None):
+    # answer - заранее известный ответ (режим без вопросов), иначе спрашиваем
+    return input(question).lower() == "y" if answer is None else answer
 
 
 def number_case(number):
@@ -26,17 +34,18 @@ def number_case(number):
     return 'ов'
 
 
-def create_solution_file(filedir, task_number, description, attachments):
-    filename = "Задача номер " + str(task_number) + (".py", ".txt")[input(" - ❔ Простой ответ? (y/n) ").lower() == "y"]
+def create_solution_file(filedir, task_number, description, attachments, simple=None, overwrite=None, log=print,
+                         data_files=()):
+    filename = "Задача номер " + str(task_number) + (".py", ".txt")[ask(" - ❔ Простой ответ? (y/n) ", simple)]
     filepath = os.path.join(solution_folder, filename)
 
     wrapper = textwrap.TextWrapper(width=120)
 
-    if not os.path.exists(filedir): os.mkdir(solution_folder)
-    if (filename in os.listdir(filedir)) and (input("Заменить файл? (y/n) ") != "y"):
-        print("Создание отменено")
+    os.makedirs(filedir, exist_ok=True)
+    if (filename in os.listdir(filedir)) and not ask("Заменить файл? (y/n) ", overwrite):
+        log("Создание отменено")
     else:
-        with open(filepath, "w", encoding="utf-8") as f:
+        with span("шаблон", task=task_number), open(filepath, "w", encoding="utf-8") as f:
             if filename.endswith(".txt"):
                 desc = '\n\n'.join([wrapper.fill(i) for i in description.split('\n')])
 
@@ -55,147 +64,188 @@ def create_solution_file(filedir, task_number, description, attachments):
                               '\n'.join(map(lambda x: f'open(r"../{x}")',
                                             map(lambda x: x.replace('\\', '/'), attachments)))
 
+                if data_files:
+                    names = ["data"] if len(data_files) == 1 else [f"data{i + 1}" for i in range(len(data_files))]
+                    files_s += '\n\n# Те же данные, уже разобранные (грузятся мгновенно):\n' + convert.loader_source + '\n'
+                    for n, (x, header) in zip(names, data_files):
+                        x = x.replace('\\', '/')
+                        files_s += f'{n} = load(r"../{x}")\n'
+                        if header: files_s += f'{n}_header = {header!r}  # Первая строка файла, в {n} не вошла\n'
+
                 f.write(
                     "# Источник: {u}\n\n"
                     "# Задача:\n{d}\n\n{f}".format(d=desc, u=url,
                                                    f=files_s if attachments else "\n")
                 )
-        print(f'Создан файл: "{filename}"')
+        log(f'Создан файл: "{filename}"')
 
 
-def get_problems_count(url):
-    response = requests.get(url, headers=headers)
-    soup = BeautifulSoup(response.text, "html.parser")
+def start_downloads(index, numbers):
+    # Все файлы нужных задач качаются одним общим пулом, пока идёт разбор и создание шаблонов;
+    # файл, нужный нескольким задачам, качается один раз
+    problems = [index[number] for number in map(str, numbers) if number in index]
+    downloads.update(attachments.fetch_all([file["url"] for problem in problems for file in problem["files"]],
+                                           headers))
 
-    prob_list = soup.find("div", class_="prob_list")
-    assert prob_list, ValueError("ОЙ! Укажите ссылку на СПИСОК задач, а не на одну задачу")
 
-    return len(prob_list)
-
-
-def parse_problem(url, problem_number):
+def parse_problem(index, problem_number, overwrite=None, log=print):
     downloaded_files = []
+    data_files = []
 
-    response = requests.get(url, headers=headers)
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    prob_list = soup.find("div", class_="prob_list")
-    assert prob_list, ValueError("ОЙ! Укажите ссылку на СПИСОК задач, а не на одну задачу")
-
-    prob_item = prob_list.find("div", class_="prob_num", string=problem_number)
-    assert prob_item, ValueError("ОЙ! Задачи с таким номером нет на сайте!")
-
-    pbody = prob_item.find_next().find("div", class_="pbody")
-    assert pbody, ValueError("ОЙ! Тело задачи не найдено!")
-
-    html_string = str(pbody)
-
-    # Ненавижу тех, кто портит данные
-    tempstr = re.sub(r"(?=<p.*?>)", "</p>", html_string).replace("</p>", "", 1)
-    le = tempstr.find("</p", tempstr.rfind("<p"))
-    ri = tempstr.rfind("</p")
-    fixed = tempstr[:le] + tempstr[ri:]
-
-    indent_next = False
-    description = ""
-    soup = BeautifulSoup(fixed, 'html.parser')
-    for item in soup.find_all("p"):
-        if not item.text:
-            indent_next = True
-            continue
-
-        if indent_next:
-            indent_next = False
-            description += '\n'
+    problem = index.get(problem_number)
+    assert problem, ValueError("ОЙ! Задачи с таким номером нет на сайте!")
 
-        c = str(item).startswith('<p class="left_margin">') or str(item).startswith('<p>')
-
-        if c:
-            description += item.get_text() + ' '
-        else:
-            indent_next = False if description.endswith('\n') else True
-
-    description = re.sub(r' +', ' ', sensible_text(description)).strip('\n ')
-
-    files = set(pbody.find_all(target="_blank"))
-    for file in pbody.find_all(src=lambda v: v and "/get_file" in v): files.add(file)
+    description = problem["description"]
+    assert description is not None, ValueError("ОЙ! Тело задачи не найдено!")
+    files = problem["files"]
 
     if files:
-        print(f" ✅ Найдено {len(files)} файл{number_case(len(files))}.")
+        log(f" ✅ Найдено {len(files)} файл{number_case(len(files))}.")
         downloaded_recent = {}
-        if not os.path.exists(download_folder):
-            os.makedirs(download_folder)
-
         sub_folder = os.path.join(download_folder, f"Задача номер {problem_number}")
-        if not os.path.exists(sub_folder):
-            os.makedirs(sub_folder)
+        os.makedirs(sub_folder, exist_ok=True)
 
         file_translations = {'Таблица': 'xlsx', 'Картинка': ['jpg', 'jpeg', 'png'], 'Текстовик': ['txt', 'docx']}
         for file in files:
-            file_url_id = [file.get(i) for i in ["href", "src"] if file.get(i) is not None][0]
-            file_url = "https://inf-ege.sdamgia.ru" + file_url_id
-            file_response = requests.get(file_url)
-            mime_type = mimetypes.guess_extension(file_response.headers["Content-Type"].split(';')[0])
+            file_url = file["url"]
+            with span("ожидание вложения", task=problem_number, file=file_url):
+                digest, content_type = downloads[file_url].result() if file_url in downloads else \
+                    attachments.fetch(file_url, headers)
+            file["hash"], file["type"] = digest, content_type
+            mime_type = mimetypes.guess_extension(content_type.split(';')[0])
 
             assert mime_type, ValueError("ОЙ! Неизвестное расширение файла")
             posFT = [k for k, v in file_translations.items()
                      if mime_type[1:] in ([v] if isinstance(v, str) else v)]
             filetype = posFT[0] if posFT else 'unknown'
-            filename = sensible_text(file.text if file.text else filetype) + mime_type
+            filename = sensible_text(file["name"] if file["name"] else filetype) + mime_type
             filepath = os.path.join(sub_folder, filename)
             downloaded_files.append(filepath)
             downloaded_recent[filename] = [False, None]
 
-            if filename in os.listdir(sub_folder) and \
-                    input(f" - ❔ Файл {filename} уже есть! Заменить? (y/n) ") != "y": continue
+            # Тот же самый файл уже лежит на месте - спрашивать не о чем
+            if filename in os.listdir(sub_folder) and not attachments.is_linked(digest, filepath) and \
+                    not ask(f" - ❔ Файл {filename} уже есть! Заменить? (y/n) ", overwrite):
+                continue
 
-            with open(filepath, 'wb') as f:
-                f.write(file_response.content)
+            attachments.link(digest, filepath)
             downloaded_recent[filename] = [True, filetype]
 
-        print(" - Скаченные файлы:")
+            converted = attachments.converted(digest, mime_type) if convert_data else None
+            if converted:
+                key, header = converted
+                data_path = os.path.splitext(filepath)[0] + ".npy"
+                attachments.link(key, data_path)
+                data_files.append((data_path, header))
+
+        log(" - Скаченные файлы:")
         for i, (recent, data) in enumerate(downloaded_recent.items()):
             state, filetype = data
-            print(f"\t{i + 1}. \033[{0 if state else 9}m{recent:25}\033[0m | {'✔' if state else '❌'} | \033[37m("
+            log(f"\t{i + 1}. \033[{0 if state else 9}m{recent:25}\033[0m | {'✔' if state else '❌'} | \033[37m("
                   f"{filetype})\033[0m")
 
     else:
-        print(" - Нечего скачивать ✖")
+        log(" - Нечего скачивать ✖")
+
+    return description, downloaded_files, data_files
+
+
+def setup_problem(index, task_number, simple=None, overwrite=None, log=print):
+    log(f"\n#===   \033[34mЗадача номер {task_number}  \033[0m ===#\n")
+    description, downloaded_files, data_files = parse_problem(index, str(task_number), overwrite, log)
+    create_solution_file(solution_folder, task_number, description, downloaded_files, simple, overwrite, log,
+                         data_files)
+    log(f"\n#=== \033[34mСоздание окончено \033[0m ===#\n")
+
+
+def setup_quietly(index, simple_tasks, overwrite, task_number):
+    # Для режима без вопросов: вывод задачи копится и печатается целиком, чтобы задачи не перемешивались
+    output = io.StringIO()
+    try:
+        setup_problem(index, task_number, task_number in simple_tasks, overwrite, partial(print, file=output))
+    except (AssertionError, OSError) as e:  # Ошибки сети (requests) - тоже OSError; остальные задачи продолжаем
+        print(f"\033[31m[❌] {e}\033[0m", file=output)
+    return output.getvalue()
+
+
+def task_numbers(task_number, count):
+    # "5", "3-7" или "all" -> список номеров; None - если номер задан неверно
+    if task_number.isnumeric():
+        return [int(task_number)]
+    if re.fullmatch(r"\d+-\d+", task_number):
+        from_, to_ = map(int, task_number.replace(" ", "").split("-"))
+        if from_ > to_:
+            error(f"Число А должно быть меньше B ({from_} < {to_})")
+        elif from_ == to_:
+            error("Числа должны быть разными")
+        else:
+            return list(range(from_, to_ + 1))
+    elif task_number == "all":
+        return list(range(1, count + 1))
+    return None
 
-    return description, downloaded_files
 
+def main_batch(task_number, simple_tasks, overwrite, jobs, refresh=False):
+    # Без единого вопроса: все задачи готовятся одновременно, вложения качаются в фоне
+    variant = manifest.load(url, headers, refresh)
+    index = variant["tasks"]
+    numbers = task_numbers(task_number, len(index))
+    if not numbers: return
 
-def setup_problem(task_number):
-    print(f"\n#===   \033[34mЗадача номер {task_number}  \033[0m ===#\n")
-    description, downloaded_files = parse_problem(url, str(task_number))
-    create_solution_file(solution_folder, task_number, description, downloaded_files)
-    print(f"\n#=== \033[34mСоздание окончено \033[0m ===#\n")
+    from multiprocessing.pool import ThreadPool
+
+    start_downloads(index, numbers)
+    with ThreadPool(jobs) as pool:
+        for output in pool.imap(partial(setup_quietly, index, simple_tasks, overwrite), numbers):
+            print(output, end="")
+    manifest.save(variant)  # Теперь в описании есть хэши скачанных файлов
 
 
 def error(*message: str):
     print("\033[31m[❌]", *message)
 
 
-if __name__ == "__main__":
+def main(refresh=False):
     print("Введи:")
     print(" * \033[34mALL\033[37m -\033[0m все задачи сразу")
     print(" * \033[34mA-B\033[37m -\033[0m задачи от \033[31mA\033[0m до \033[32mB\033[0m")
     print()
 
     task_number = input(" - ❔ Номер задачи: ").lower()
-    count = get_problems_count(url)
+    variant = manifest.load(url, headers, refresh)
+    index = variant["tasks"]
+    numbers = task_numbers(task_number, len(index))
+    if not numbers: return
 
-    if task_number.isnumeric():
-        setup_problem(task_number)
-    elif re.fullmatch(r"\d+-\d+", task_number):
-        from_, to_ = map(int, task_number.replace(" ", "").split("-"))
-        if from_ > to_:
-            error(f"Число А должно быть меньше B ({from_} < {to_})")
-        elif from_ == to_:
-            error("Числа должны быть разными")
-        else:
-            for i in range(from_, to_+1):
-                setup_problem(i)
-    elif task_number == "all":
-        for i in range(1, count+1):
-            setup_problem(i)
+    start_downloads(index, numbers)
+    for i in numbers:
+        setup_problem(index, i)
+    manifest.save(variant)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Создание шаблонов решений и скачивание файлов задач")
+    parser.add_argument("tasks", nargs="?", help="номер задачи, A-B или ALL; если указан - работаем без вопросов")
+    parser.add_argument("--simple", metavar="НОМЕРА", help=f"задачи с простым ответом (.txt) через запятую, "
+                                                           f"по умолчанию {simple_tasks}")
+    parser.add_argument("--overwrite", choices=["yes", "no"], default=overwrite,
+                        help="заменять ли уже существующие файлы")
+    parser.add_argument("--jobs", type=int, default=8, help="сколько задач готовить одновременно")
+    parser.add_argument("--refresh", action="store_true", help="заново прочитать вариант с сайта")
+    parser.add_argument("--bundle", metavar="ФАЙЛ", help="брать всё из архива bundle.py, а не из сети")
+    parser.add_argument("--trace", action="store_true", help=f"замерить время стадий и записать в {trace_file}")
+    parser.add_argument("--profile", metavar="СТАДИЯ", help="прогнать стадию через cProfile")
+    arguments = parser.parse_args()
+
+    if arguments.bundle: web.use_bundle(arguments.bundle)
+    if arguments.tasks:
+        simple = [int(i) for i in arguments.simple.split(",") if i.strip()] if arguments.simple is not None \
+            else simple_tasks
+        main_batch(arguments.tasks.lower(), simple, arguments.overwrite == "yes", arguments.jobs, arguments.refresh)
+    else:
+        main(arguments.refresh)
+
+    web.report()
+    finish()
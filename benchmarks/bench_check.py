@@ -0,0 +1,90 @@
+import os
+import sys
+import random
+import argparse
+import tempfile
+import threading
+from time import perf_counter
+from collections import defaultdict
+
+repo_folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_folder)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from stand_in import StandIn, answer_for  # noqa: E402
+
+stages = defaultdict(float)
+stages_lock = threading.Lock()
+
+
+def timed(stage, func):
+    # Суммарное время стадии по всем потокам (для сравнения между прогонами, не для стены)
+    def wrapper(*args, **kwargs):
+        st = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with stages_lock:
+                stages[stage] += perf_counter() - st
+    return wrapper
+
+
+def make_solutions(folder, task_count, max_work, max_size, seed):
+    rnd = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    for number in range(1, task_count + 1):
+        work = rnd.randint(0, max_work)
+        padding = "\n".join(f"# строка {i}" for i in range(rnd.randint(0, max_size)))
+        with open(os.path.join(folder, f"Задача номер {number}.py"), "w", encoding="utf-8") as f:
+            f.write(f"{padding}\ns = sum(range({work}))\nprint({answer_for(number)})\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер пропускной способности check.py на локальной копии сайта")
+    parser.add_argument("--tasks", type=int, default=27, help="задач в варианте")
+    parser.add_argument("--students", type=int, default=1, help="папок с решениями")
+    parser.add_argument("--latency", type=float, default=0.05, help="задержка ответа сервера, с")
+    parser.add_argument("--work", type=int, default=2_000_000, help="макс. длина цикла в решении")
+    parser.add_argument("--size", type=int, default=200, help="макс. число лишних строк в решении")
+    parser.add_argument("--runs", type=int, default=2, help="прогонов подряд (следующие идут с кэшем)")
+    parser.add_argument("--seed", type=int, default=1)
+    arguments = parser.parse_args()
+
+    # Кэш, хранилище результатов и отчёты пишутся в относительные пути - работаем во временной папке
+    workdir = tempfile.mkdtemp(prefix="bench_check_")
+    os.chdir(workdir)
+
+    import web
+    import check
+    import manifest
+    web.get_text = timed("скачивание", web.get_text)
+    manifest.get_text = timed("скачивание", manifest.get_text)
+    check.get_correct_answer = timed("разбор ответа", check.get_correct_answer)
+    check.run_solution = timed("выполнение", check.run_solution)
+    check.run_solution_warm = timed("выполнение", check.run_solution_warm)
+    check.write_html_table = timed("отчёт", check.write_html_table)
+
+    with StandIn(arguments.tasks, arguments.latency) as site:
+        jobs = []
+        for student in range(arguments.students):
+            folder = f"student{student + 1}"
+            make_solutions(folder, arguments.tasks, arguments.work, arguments.size, arguments.seed + student)
+            jobs.append((site.url, folder, os.path.join(folder, "answers.html")))
+
+        print(f"Папка: {workdir}")
+        print(f"{'Прогон':6} | {'Стена, с':8} | {'Задач/с':8} | {'Запросов':8} | Стадии (сумма по потокам), с")
+        for run in range(arguments.runs):
+            stages.clear()
+            site.requests = 0
+            st = perf_counter()
+            variants = check.check_variants(jobs)
+            wall = perf_counter() - st
+
+            checked = sum(len(variant["table"]) - 1 for variant in variants)
+            wrong = sum(len(variant["wrongs"]) for variant in variants)
+            breakdown = ", ".join(f"{k}: {v:.3f}" for k, v in sorted(stages.items()))
+            print(f"{run + 1:6} | {wall:8.3f} | {checked / wall:8.1f} | {site.requests:8} | {breakdown}"
+                  + (f" | \033[31mошибок: {wrong}\033[0m" if wrong else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import os
+import re
+import sys
+from timeit import timeit
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from extract import extract_description, sensible_text  # noqa: E402
+from stand_in import list_page  # noqa: E402
+
+descriptions_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "descriptions")
+repeat = 200
+
+
+def old_parse_description(pbody):
+    # Старый способ из parse_problem: str() -> regex -> второй разбор -> str() каждого абзаца
+    html_string = str(pbody)
+
+    tempstr = re.sub(r"(?=<p.*?>)", "</p>", html_string).replace("</p>", "", 1)
+    le = tempstr.find("</p", tempstr.rfind("<p"))
+    ri = tempstr.rfind("</p")
+    fixed = tempstr[:le] + tempstr[ri:]
+
+    indent_next = False
+    description = ""
+    soup = BeautifulSoup(fixed, 'html.parser')
+    for item in soup.find_all("p"):
+        if not item.text:
+            indent_next = True
+            continue
+
+        if indent_next:
+            indent_next = False
+            description += '\n'
+
+        c = str(item).startswith('<p class="left_margin">') or str(item).startswith('<p>')
+
+        if c:
+            description += item.get_text() + ' '
+        else:
+            indent_next = False if description.endswith('\n') else True
+
+    return re.sub(r' +', ' ', sensible_text(description)).strip('\n ')
+
+
+def main():
+    pages = {}
+    for name in sorted(os.listdir(descriptions_folder)):
+        with open(os.path.join(descriptions_folder, name), encoding="utf-8") as f:
+            pages[name[:-len(".html")]] = f.read()
+    pages["stand_in (27 задач)"] = list_page(27)
+
+    failed = 0
+    print(f"{'Страница':20} | {'Тел':>4} | {'Совпало':7} | {'Таблиц':>6} | {'Формул':>6} | {'Файлов':>6} | "
+          f"Старый, мс | Новый, мс")
+    for name, page in pages.items():
+        pbodies = BeautifulSoup(page, "html.parser").find_all("div", class_="pbody")
+        results = [extract_description(pbody) for pbody in pbodies]
+
+        ok = all(result.text == old_parse_description(pbody) for pbody, result in zip(pbodies, results))
+        failed += not ok
+        old = timeit(lambda: [old_parse_description(pbody) for pbody in pbodies], number=repeat) / repeat * 1000
+        new = timeit(lambda: [extract_description(pbody) for pbody in pbodies], number=repeat) / repeat * 1000
+
+        print(f"{name:20} | {len(pbodies):4} | \033[{32 if ok else 31}m{str(ok):7}\033[0m | "
+              f"{sum(len(r.tables) for r in results):6} | {sum(len(r.formulas) for r in results):6} | "
+              f"{sum(len(r.attachments) for r in results):6} | {old:10.3f} | {new:9.3f}")
+
+    print(f"\nРасхождений со старым способом: {failed} из {len(pages)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import os
+import re
+import sys
+import json
+from timeit import timeit
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from extract import extract_answer  # noqa: E402
+
+pages_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pages")
+repeat = 50
+
+
+def full_parse_answer(page):
+    # Старый способ из check_task: разбираем страницу целиком
+    soup = BeautifulSoup(page, 'html.parser')
+    datablob = soup.find("div", id=lambda v: v and re.fullmatch(r'sol\d+', v)).text.lower()
+    le = datablob.rfind("ответ") + 6
+    ri = datablob.find(".", le)
+    if ri == -1: ri = len(datablob)
+    correct = datablob.split()[-1].strip('\n. ') if le == 5 else datablob[le:ri].strip()
+    return correct
+
+
+def main():
+    with open(os.path.join(pages_folder, "expected.json"), encoding="utf-8") as f:
+        expected = json.load(f)
+
+    pages = {}
+    for name in expected:
+        with open(os.path.join(pages_folder, name + ".html"), encoding="utf-8") as f:
+            pages[name] = f.read()
+
+    failed = 0
+    print(f"{'Страница':20} | {'Ожидали':10} | {'Получили':10} | {'Способ':12} | Старый, мс | Новый, мс")
+    for name, page in pages.items():
+        result = extract_answer(page)
+        old = timeit(lambda: full_parse_answer(page), number=repeat) / repeat * 1000
+        new = timeit(lambda: extract_answer(page), number=repeat) / repeat * 1000
+
+        ok = result.answer == expected[name]
+        failed += not ok
+        print(f"{name:20} | {expected[name]:10} | \033[{32 if ok else 31}m{result.answer:10}\033[0m | "
+              f"{result.method:12} | {old:10.2f} | {new:9.2f}")
+
+    print(f"\nОшибок: {failed} из {len(pages)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import os
+import sys
+import argparse
+import subprocess
+from collections import defaultdict
+
+repo_folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Сколько может стоить импорт скрипта, мс (без запуска самого интерпретатора и site)
+budget = {"check": 60, "auto": 60}
+
+
+def import_times(module):
+    # Разбирает вывод -X importtime: модуль -> (собственное время, вместе с вложенными), мкс
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=repo_folder,
+                            capture_output=True, text=True, encoding="UTF-8")
+    assert result.returncode == 0, ValueError(f"ОЙ! import {module} упал:\n{result.stderr}")
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line: continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit(): continue  # Строка заголовка
+        if name.strip() == "site":
+            times = {}  # Всё, что до этого, грузит сам интерпретатор - к скриптам не относится
+            continue
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Время импорта check.py и auto.py по -X importtime")
+    parser.add_argument("--runs", type=int, default=5, help="сколько раз запускать (берётся лучший)")
+    parser.add_argument("--top", type=int, default=8, help="сколько самых дорогих модулей показать")
+    arguments = parser.parse_args()
+
+    over = 0
+    for module, limit in budget.items():
+        runs = [import_times(module) for _ in range(arguments.runs)]
+        best = min(runs, key=lambda times: times[module][1])
+        total = best[module][1] / 1000
+
+        # Собственное время модулей, лучшее из всех запусков - так меньше шума
+        own = defaultdict(lambda: float("inf"))
+        for times in runs:
+            for name, (self_us, _) in times.items():
+                own[name] = min(own[name], self_us)
+        heaviest = sorted(((us, name) for name, us in own.items() if name in best), reverse=True)[:arguments.top]
+
+        ok = total <= limit
+        over += not ok
+        print(f"import {module}: \033[{32 if ok else 31}m{total:.1f} мс\033[0m (бюджет {limit} мс)")
+        for us, name in heaviest:
+            print(f"\t{us / 1000:6.2f} мс  {name}")
+
+    sys.exit(1 if over else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import os
+import re
+import threading
+from time import sleep
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+pages_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pages")
+first_id = 1000
+
+
+def answer_for(number):
+    return str(number * 7 + 11)
+
+
+def list_page(task_count):
+    # Форма как у списка задач на sdamgia: prob_num, ссылка на решение и тело задачи
+    items = []
+    for number in range(1, task_count + 1):
+        problem_id = first_id + number
+        attachment = f'<a href="/get_file?id={problem_id}" target="_blank">{number}.txt</a>' if number % 3 == 0 else ''
+        items.append(
+            f'<div class="prob_maindiv"><div class="prob_num">{number}</div><div class="nobreak">'
+            f'<span class="prob_nums">Тип {number} № <a href="/problem?id={problem_id}">{problem_id}</a></span>'
+            f'<div class="pbody"><p class="left_margin">Задание {number}. Определите количество чисел '
+            f'на отрезке, удовлетворяющих условию.</p><p class="left_margin">В ответе запишите '
+            f'число. {attachment}</p><p></p></div></div></div>\n'
+        )
+    return "<html><head><meta charset='utf-8'></head><body><div class='prob_list'>\n" + \
+           "".join(items) + "</div></body></html>"
+
+
+def solution_page(problem_id):
+    with open(os.path.join(pages_folder, "answer_word.html"), encoding="utf-8") as f:
+        page = f.read()
+    page = re.sub(r'id="sol\d+"', f'id="sol{problem_id}"', page)
+    return page.replace("Ответ: 42.", f"Ответ: {answer_for(problem_id - first_id)}.")
+
+
+def attachment(problem_id, lines=10000):
+    return "\n".join(str((problem_id * i) % 100003) for i in range(lines)).encode()
+
+
+class StandIn:
+    # Локальная замена сайта: отдаёт список задач, страницы решений и файлы с задержкой latency
+    def __init__(self, task_count=27, latency=0.0, port=0):
+        self.task_count = task_count
+        self.latency = latency
+        self.requests = 0
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args): pass
+
+            def do_GET(self):
+                stand_in.requests += 1
+                sleep(stand_in.latency)
+                path = urlparse(self.path)
+                query = parse_qs(path.query)
+
+                if path.path == "/test":
+                    body, content_type = list_page(stand_in.task_count).encode(), "text/html; charset=utf-8"
+                elif path.path == "/problem":
+                    body, content_type = solution_page(int(query["id"][0])).encode(), "text/html; charset=utf-8"
+                elif path.path == "/get_file":
+                    body, content_type = attachment(int(query["id"][0])), "text/plain"
+                else:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/test?id=1"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,50 @@
+import os
+import json
+import hashlib
+import zipfile
+import argparse
+
+import attachments
+import manifest
+from config import url
+from disk import atomic_file
+from web import fetch_all
+
+
+def export(path, list_urls, headers=None):
+    # Собирает в один zip страницы списков, страницы решений и файлы задач; index.json - ссылка -> место в архиве
+    index = {}
+    written = set()
+    with atomic_file(path, 'wb') as target, zipfile.ZipFile(target, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for list_url in list_urls:
+            tasks = manifest.load(list_url, headers, refresh=True)["tasks"].values()
+            # Страница с ошибкой в архиве всплыла бы только потом, без сети - такой архив не собираем вовсе
+            pages = fetch_all([list_url] + [task["link"] for task in tasks if task["link"]], headers, strict=True)
+            files = attachments.fetch_all([file["url"] for task in tasks for file in task["files"]], headers)
+
+            for page_url, future in pages.items():
+                name = "pages/" + hashlib.sha1(page_url.encode("utf-8")).hexdigest() + ".html"
+                archive.writestr(name, future.result().encode("utf-8"))
+                index[page_url] = {"name": name, "encoding": "utf-8"}
+
+            for file_url, future in files.items():
+                digest, content_type = future.result()
+                name = "files/" + digest  # Одинаковые файлы разных задач лежат в архиве один раз
+                if name not in written:
+                    archive.write(attachments.blob(digest), name)
+                    written.add(name)
+                index[file_url] = {"name": name, "type": content_type}
+
+        archive.writestr("index.json", json.dumps(index, ensure_ascii=False, indent=1))
+    return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сохранение вариантов в один архив для работы без интернета "
+                                                 "(потом: check.py --bundle ФАЙЛ, auto.py --bundle ФАЙЛ)")
+    parser.add_argument("file", help="куда записать архив")
+    parser.add_argument("urls", nargs="*", default=[url], help="ссылки на списки задач (по умолчанию из config.py)")
+    arguments = parser.parse_args()
+
+    saved = export(arguments.file, arguments.urls)
+    print(f"В {arguments.file} сохранено {len(saved)} страниц и файлов ({os.path.getsize(arguments.file)} байт)")
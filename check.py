@@ -1,20 +1,34 @@
 import os
 import re
-import subprocess
-import multiprocessing
+import json
+import queue
 from time import time
 from datetime import date
 
-import requests
-from bs4 import BeautifulSoup
-
 from config import *
-
-
-def generate_html_table(table, wrongs, newest_list, task_count):
-    table_html = "<html>\n<head>\n<meta charset='UTF-8'>\n{}\n</head>\n<body style='background-color: #2b2b2b;'>\n" \
-    .format(
-        """<style>
+import store
+import manifest
+import web
+from disk import atomic_file
+from tracing import span, traced, finish
+import watch
+from runner import WarmPool, SolutionCrashed, measure_run
+from extract import extract_answer
+from web import fetch_all
+
+TIMEOUT = "TIMEOUT"
+CRASH = "ПАДЕНИЕ"  # Интерпретатор решения убит сигналом (segfault, нехватка памяти), а не кончилось время
+fetch_timeout = 30  # Сколько ждать результат сверх времени на решение (скачивание ответа)
+header = 'Номер Ответ Правильность Да Ссылка Время ЦП Память Прогноз'.split()
+
+# Столбец статистики: (ключ, формат, порог, ниже которого значение не считается выбросом)
+stats_columns = {
+    5: ("wall", lambda v: f"{v:.2f} с", 0.1),
+    6: ("cpu", lambda v: f"{v:.2f} с", 0.1),
+    7: ("rss", lambda v: f"{v / 1024 ** 2:.0f} МБ", 64 * 1024 ** 2),
+}
+
+table_style = """<style>
             table { background-color: #f0f0f0; border-color: black; border: black; white-space: pre; }
             h1 {
                 background-color: #3c3f41;
@@ -30,45 +44,74 @@ def generate_html_table(table, wrongs, newest_list, task_count):
                 background-color: black;
                 color: white;
             }
-            </style>""")
+            </style>"""
+
+
+def stats_cells(stats):
+    if not stats: return [None, None, None]
+    cpu = stats["user"] + stats["sys"] if stats.get("user") is not None else None
+    return [stats["wall"], cpu, stats.get("rss")]
+
+
+def stats_limits(table):
+    # Выброс - втрое больше медианы по столбцу (или больше половины таймаута для времени)
+    limits = {}
+    for i, (_, _, floor) in stats_columns.items():
+        values = sorted(row[i] for row in table[1:] if row[i] is not None)
+        if not values: continue
+        limits[i] = max(values[len(values) // 2] * 3, floor)
+        if i != 7: limits[i] = min(limits[i], timeout / 2)
+    return limits
+
+
+def generate_html_table(table, wrongs, newest_list, task_count, cached_list=(), live=False):
+    # Отдаёт страницу по кусочкам, чтобы писать её в файл без склейки одной большой строки
+    yield "<html>\n<head>\n<meta charset='UTF-8'>\n{}{}\n</head>\n<body style='background-color: #2b2b2b;'>\n" \
+    .format(
+        "<meta http-equiv='refresh' content='1'>\n" if live else "",
+        table_style)
 
     # Заголовок
-    table_html += "<h1 align='center'>Правильность ответов:</h1>\n"
+    yield "<h1 align='center'>Правильность ответов:</h1>\n" if not live else \
+        f"<h1 align='center'>Проверяем... Готово: {len(table) - 1}</h1>\n"
     # Начало таблицы
-    table_html += "<table border='1' cellpadding='10' align='center'>\n"
+    yield "<table border='1' cellpadding='10' align='center'>\n"
 
     # Заголовок таблицы
-    table_html += "<tr style='background-color: black; color: white; font-weight: bold;'>\n"
+    yield "<tr style='background-color: black; color: white; font-weight: bold;'>\n"
     for item in table[0]:
-        table_html += f"<th>{item}</th>\n"
-    table_html += "</tr>\n"
+        yield f"<th>{item}</th>\n"
+    yield "</tr>\n"
 
     # Остальные строки таблицы
-    try:
-        spacesM = max([len(i[3].split('\n')[0]) for i in table[1:]])
-    except ValueError:
-        return table_html + "</table>\n"
+    spacesM = max([len(i[3].split('\n')[0]) for i in table[1:]], default=1)
     counter = [0, 0, 0]
+    rows = {i[0]: i for i in table[1:]}
+    limits = stats_limits(table)
 
     for j in range(1, task_count + 1):
-        possible_row = [i for i in table if i[0] == f'#{j}']
-        row = possible_row[0] if possible_row else [f'#{j}', '', '💫', '❔', None]
+        row = list(rows.get(f'#{j}', [f'#{j}', '', '💫', '❔', None, None, None, None, None]))
         if not isinstance(row[2], bool):
-            table_html += "<tr style='background-color: #f0f0ff'>\n"
+            yield "<tr style='background-color: #f0f0ff'>\n"
         else:
             if row[1] == '???':
-                table_html += "<tr style='background-color: #c0ffc0'>\n"
+                yield "<tr style='background-color: #c0ffc0'>\n"
                 row[1] = '❔❔❔'
             elif row[1] == '_skip_':
-                table_html += "<tr style='background-color: #c0c0ff'>\n"
+                yield "<tr style='background-color: #c0c0ff'>\n"
                 row[1] = '▶ ▶ Пропуск ▶ ▶'
                 row[2] = '💫'
             else:
-                table_html += "<tr>\n" if row[2] else "<tr style='background-color: #fff0f0'>\n"
+                yield "<tr>\n" if row[2] else "<tr style='background-color: #fff0f0'>\n"
 
         for i, item in enumerate(row):
             item_s = f"<td align='center'>{item}</td>\n"
-            if i == 4:
+            if i == 8:
+                item_s = f"<td align='center' style='color: gray'>{f'~{item:.2f} с' if item is not None else ''}</td>\n"
+            elif i in stats_columns:
+                style = " style='color: red; font-weight: bold'" if item is not None and item >= limits[i] else ""
+                item_s = f"<td align='center'{style}>{stats_columns[i][1](item) if item is not None else ''}</td>\n"
+            elif i == 4:
                 item_s = f"<td align='center'><a href={item}>*Клик*</a></td>\n" if item else "<td></td>"
             elif i == 3:
                 sp = ' ' * (spacesM - len(item) + 1)
@@ -88,18 +131,19 @@ def generate_html_table(table, wrongs, newest_list, task_count):
                 else:
                     item_s = f"<td align='center' style='color: green'>✔</td>\n"
                     counter[0] += 1
-            elif i == 0 and item[1:] in newest_list:
-                item_s = f"<td align='center'>      {item} 📔</td>\n"
+            elif i == 0 and (item[1:] in newest_list or item[1:] in cached_list):
+                marks = ('📔' if item[1:] in newest_list else '') + ('💾' if item[1:] in cached_list else '')
+                item_s = f"<td align='center'>      {item} {marks}</td>\n"
 
-            table_html += '\t' + item_s
-        table_html += "</tr>\n"
+            yield '\t' + item_s
+        yield "</tr>\n"
 
     # Закрываем таблицу
-    table_html += "</table>\n"
+    yield "</table>\n"
 
     # Создаём таблицу с результатами
     wrong_style = "align='center' style='color: red'"
-    table_html += f"""\
+    yield f"""\
 <h1 align='center'>Результаты:</h1>
 <table border='1' cellpadding='10' align='center'>
     <tr>
@@ -117,124 +161,374 @@ def generate_html_table(table, wrongs, newest_list, task_count):
 </table>"""
 
     # Окончание
-    table_html += "</body>\n</html>"
+    yield "</body>\n</html>"
 
-    return table_html
 
+@traced("отчёт")
+def write_html_table(path, *args, **kwargs):
+    # Браузер никогда не увидит недописанную страницу
+    with atomic_file(path, 'w', encoding='utf-8') as f:
+        f.writelines(generate_html_table(*args, **kwargs))
 
-def check_task(filename, link, answer=None):
-    os.chdir(solution_folder)
-    if answer is None:
-        answer = subprocess.run(["python", filename, "checker"],
-                                capture_output=True, text=True, encoding="UTF-8").stdout.lower().strip(' \n')
-    os.chdir('../')
 
-    response = requests.get(link)
-    soup = BeautifulSoup(response.text, 'html.parser')
+def write_stats_json(path, table):
+    # Те же данные, что и в отчёте, но для программ: время и память каждого решения
+    rows = []
+    for row in table[1:]:
+        item = {"task": row[0][1:], "answer": row[1], "correct": row[3], "ok": row[2] is True, "link": row[4]}
+        item.update({stats_columns[i][0]: row[i] for i in stats_columns})
+        item["predicted"] = row[8]
+        rows.append(item)
 
-    datablob = soup.find("div", id=lambda v: v and re.fullmatch(r'sol\d+', v)).text.lower()
-    le = datablob.rfind("ответ") + 6
-    ri = datablob.find(".", le)
-    if ri == -1: ri = len(datablob)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(sorted(rows, key=lambda r: int(r["task"])), f, ensure_ascii=False, indent=1)
 
-    correct = datablob.split()[-1].strip('\n. ') if le == 5 else datablob[le:ri].strip()
-    correct = correct.replace(' ', '').replace('—', '')
 
-    if not correct[0].isalpha() and not correct.replace(' ', '').isnumeric():
-        correct = soup.select('center > p')[0].get_text('\n')
+def generate_summary_table(variants):
+    yield f"<html>\n<head>\n<meta charset='UTF-8'>\n{table_style}\n</head>\n<body style='background-color: #2b2b2b;'>\n"
+    yield "<h1 align='center'>Сводка по ученикам:</h1>\n"
+    yield "<table border='1' cellpadding='10' align='center'>\n"
+    yield "<tr style='background-color: black; color: white; font-weight: bold;'>\n" \
+          "<th>Решения</th><th>✔</th><th>✖</th><th>⚪</th><th>Исправить</th><th>Отчёт</th>\n</tr>\n"
 
-    clear_correct = ' '.join(re.findall(r"[\da-z]+", correct)) if not correct.isalpha() else correct
-    return filename, answer, clear_correct, link
+    for variant in variants:
+        states = [row[2] for row in variant["table"][1:]]
+        right = sum(i is True for i in states)
+        wrong = sum(i is False for i in states)
+        other = variant["task_count"] - right - wrong
 
+        yield "<tr>\n"
+        yield f"\t<td>{variant['folder']}</td>\n"
+        yield f"\t<td align='center' style='color: green'>{right}</td>\n"
+        yield f"\t<td align='center' style='color: red'>{wrong}</td>\n"
+        yield f"\t<td align='center' style='color: blue'>{other}</td>\n"
+        yield f"\t<td align='center' style='color: red'>{', '.join(variant['wrongs'])}</td>\n"
+        yield f"\t<td align='center'><a href='{variant['report']}'>*Клик*</a></td>\n"
+        yield "</tr>\n"
 
-def main():
-    print("Вывод осуществляется в", answers)
+    yield "</table>\n</body>\n</html>"
 
-    if not os.path.exists(solution_folder): os.mkdir(solution_folder)
 
-    newest = None
-    newest_list = []
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
+@traced("выполнение", arg=1)
+def run_solution(folder, filename):
+    # Папку задаём только дочернему процессу: текущая папка общая для всех потоков
+    answer, stats = measure_run(["python", filename, "checker"], folder, timeout)
+    return filename, TIMEOUT if answer is None else answer.lower().strip(' \n'), stats
 
-    prob_list = soup.find("div", class_="prob_list")
-    assert prob_list, ValueError("ОЙ! Укажите ссылку на СПИСОК задач, а не на одну задачу")
 
-    tasks = {}
-    table = ['Номер Ответ Правильность Да Ссылка'.split()]
-    with multiprocessing.Pool() as pool:
-        task_count = len(prob_list.find_all("div", class_="prob_num"))
-        for filename in os.listdir(solution_folder):
-            if not re.fullmatch("Задача номер \d+\..{2,3}$", filename): continue
+@traced("выполнение", arg=2)
+def run_solution_warm(workers, folder, filename):
+    answer, stats = workers.run(os.path.abspath(os.path.join(folder, filename)), os.path.abspath(folder), timeout)
+    return filename, TIMEOUT if answer is None else answer.lower().strip(' \n'), stats
 
-            problem_number = [i for i in filename[:filename.find('.')].split(' ') if i.isnumeric()][-1]
-            filepath = os.path.join(solution_folder, filename)
-            mod_time = date.fromtimestamp(os.path.getmtime(filepath))
 
-            if newest is None: newest = mod_time
+@traced("разбор ответа")
+def get_correct_answer(page):
+    # (ответ, уверенность); на диск попадают только ответы с полной уверенностью
+    result = extract_answer(page)
+    if result.confidence < 1:
+        debug_print(f"Ответ {result.answer!r} найден способом {result.method}, уверенность {result.confidence}")
+    return result.answer, result.confidence
 
-            if mod_time > newest:
-                # noinspection PyUnusedLocal
-                newest = mod_time
-                newest_list = [problem_number]
-            elif mod_time.day == newest.day:
-                newest_list.append(problem_number)
 
-            prob_item = prob_list.find("div", class_="prob_num", string=problem_number)
-            assert prob_item, ValueError("ОЙ! Задачи с таким номером нет на сайте!")
+@traced("описание варианта")
+def problem_links(list_url):
+    # Номер задачи -> ссылка на её решение (None, если ссылки нет); берётся из сохранённого описания варианта
+    return {k: task["link"] for k, task in manifest.load(list_url)["tasks"].items()}
 
-            nums = prob_item.find_next().find("span", class_="prob_nums")
-            assert nums, ValueError("ОЙ! Ссылка на ответ не найдена!")
 
-            link = url[:url.find('/', url.find('//') + 2)] + nums.find('a')["href"]
+def solution_number(filename):
+    # Номер задачи из имени файла решения ("Задача номер 5.py" -> "5"); None - это не файл решения
+    if not re.fullmatch(r"Задача номер \d+\..{2,3}$", filename): return None
+    return [i for i in filename[:filename.find('.')].split(' ') if i.isnumeric()][-1]
 
-            if filename.endswith(".txt"):
-                with open(filepath, encoding="utf-8") as f:  # !
-                    s = f.read()
-                    le = s.find("Ответ: ") + 6
-                    ri = s.find('\n', le)
-                    answer = s[le:ri].strip()
 
-                    tasks[problem_number] = pool.apply_async(check_task, (filename, link, answer)), link
-            else:
-                tasks[problem_number] = pool.apply_async(check_task, (filename, link)), link
+def read_txt_answer(filepath):
+    with open(filepath, encoding="utf-8") as f:  # !
+        s = f.read()
+        le = s.find("Ответ: ") + 6
+        ri = s.find('\n', le)
+        return s[le:ri].strip()
+
+
+def plan_variant(list_url, folder, report, saved, submit):
+    # Разбирает список задач и отправляет решения на проверку, возвращает состояние проверки ученика
+    if not os.path.exists(folder): os.mkdir(folder)
+
+    newest = None
+    variant = {
+        "folder": folder, "report": report, "links": {}, "hashes": {}, "predicted": {},
+        "newest_list": [], "cached_list": [],
+        "table": [header], "wrongs": [],
+    }
+
+    links = problem_links(list_url)
+    variant["task_count"] = len(links)
+    for filename in os.listdir(folder):
+        problem_number = solution_number(filename)
+        if problem_number is None: continue
+
+        filepath = os.path.join(folder, filename)
+        mod_time = date.fromtimestamp(os.path.getmtime(filepath))
+
+        if newest is None: newest = mod_time
+
+        if mod_time > newest:
+            # noinspection PyUnusedLocal
+            newest = mod_time
+            variant["newest_list"] = [problem_number]
+        elif mod_time.day == newest.day:
+            variant["newest_list"].append(problem_number)
+
+        # Лишний файл в папке одного ученика - строка ОШИБКА в его отчёте, а не остановка всей проверки
+        variant["links"][problem_number] = links.get(problem_number)
+        if not links.get(problem_number):
+            error = "ОЙ! Задачи с таким номером нет на сайте!" if problem_number not in links else \
+                "ОЙ! Ссылка на ответ не найдена!"
+            print(f"{filepath}: {error}")
+            submit(problem_number, ValueError(error))
+            continue
+
+        # Решение не менялось с прошлой проверки - берём сохранённый ответ
+        variant["hashes"][problem_number] = store.solution_hash(filepath, problem_number)
+        known = saved["tasks"].get(filepath)
+        if known and known["hash"] == variant["hashes"][problem_number] and known["answer"] != TIMEOUT:
+            variant["cached_list"].append(problem_number)
+            submit(problem_number, (filename, known["answer"], known.get("stats")))
+            continue
+
+        if filename.endswith(".txt"):
+            submit(problem_number, (filename, read_txt_answer(filepath), None))
+        else:
+            variant["predicted"][problem_number] = store.predict_runtime(saved, filepath, timeout)
+            submit(problem_number, filename, variant["predicted"][problem_number])
+
+    return variant
+
+
+def record_result(variant, k, result, pages, saved):
+    problem_number = '#' + k
+    table, wrongs = variant["table"], variant["wrongs"]
+    link = variant["links"][k]
+    predicted = variant["predicted"].get(k)
+    if isinstance(result, SolutionCrashed):
+        debug_print(f"Задача {k}:", result)
+        table.append([problem_number, CRASH, '💥', '❔', link] + stats_cells(None) + [predicted])
+        wrongs.append(problem_number)
+        return
+    if isinstance(result, Exception):
+        debug_print(f"Задача {k}:", repr(result))
+        table.append([problem_number, 'ОШИБКА', '⚠', '❔', link] + stats_cells(None) + [predicted])
+        wrongs.append(problem_number)
+        return
+
+    filename, raw_answer, stats = result
+    try:
+        correct, confidence = (saved["answers"][link], 1) if saved["answers"].get(link) else \
+            get_correct_answer(pages[link].result(timeout=fetch_timeout))
+    except Exception as exc:
+        debug_print(f"Задача {k}:", repr(exc))
+        table.append([problem_number, raw_answer or '✖', '⚠', '❔', link] + stats_cells(stats) + [predicted])
+        wrongs.append(problem_number)
+        return
+
+    filepath = os.path.join(variant["folder"], filename)
+    if confidence == 1: saved["answers"][link] = correct
+    saved["tasks"][filepath] = {"hash": variant["hashes"][k], "answer": raw_answer, "stats": stats}
+    if stats and k not in variant["cached_list"]:
+        store.remember_runtime(saved, filepath, stats["wall"])
+
+    if raw_answer == TIMEOUT:
+        table.append([problem_number, TIMEOUT, '⏰', correct, link] + stats_cells(stats) + [predicted])
+        wrongs.append(problem_number)
+        return
+
+    if raw_answer != correct: wrongs.append(problem_number)
+    answer = raw_answer if raw_answer else '✖'
+    state = answer == correct
+
+    table.append([problem_number, answer, state, correct, link] + stats_cells(stats) + [predicted])
+
+
+def check_variants(jobs, refresh=False):
+    # jobs - список (ссылка на вариант, папка с решениями, файл отчёта); все решения идут в один общий пул
+    # refresh - заново прочитать варианты с сайта, а не брать сохранённые описания
+    from multiprocessing.pool import ThreadPool
+
+    results = queue.Queue()
+    saved = store.load()
+
+    if refresh:
+        for list_url in dict.fromkeys(job[0] for job in jobs):
+            # Вариант перечитываем с сайта - значит, и сохранённые ответы к нему тоже
+            for task in manifest.load(list_url, refresh=True)["tasks"].values():
+                saved["answers"].pop(task["link"], None)
+    variants = []
+    pending = {}
+
+    # Потоки только ждут дочерние процессы (тёплые или обычные), поэтому их может быть больше ядер
+    runs = []
+    workers = WarmPool(pool_size, memory_limit=memory_limit) if warm_workers else None
+    with ThreadPool(workers.size if workers else pool_size or os.cpu_count()) as pool:
+        for i, (list_url, folder, report) in enumerate(jobs):
+            def submit(problem_number, task, predicted=None, key=i, folder=folder):
+                pending[key, problem_number] = True
+                if not isinstance(task, str):
+                    results.put((key, problem_number, task))  # Ответ уже известен
+                else:
+                    runs.append((predicted, key, problem_number, folder, task))
+
+            variants.append(plan_variant(list_url, folder, report, saved, submit))
+
+        # Самые долгие по прошлым запускам - первыми (LPT): так общее время проверки минимально
+        for predicted, key, problem_number, folder, task in sorted(runs, key=lambda run: -run[0]):
+            func, args = (run_solution_warm, (workers, folder, task)) if workers else \
+                (run_solution, (folder, task))
+            pool.apply_async(
+                func, args,
+                callback=lambda result, key=key, k=problem_number: results.put((key, k, result)),
+                error_callback=lambda exc, key=key, k=problem_number: results.put((key, k, exc))
+            )
+
+        pool.close()
+
+        # Пока решения считаются, параллельно скачиваем страницы с ответами (общие страницы - один раз).
+        # Раз ответа нет в хранилище (не сохранён или сброшен --refresh), страницу спрашиваем у сайта, а не у кэша
+        pages = fetch_all([link for variant in variants for link in variant["links"].values()
+                           if link and not saved["answers"].get(link)], ttl=0)
 
-        wrongs = []
-        finished = []
         print("Вычисляем...")
 
-        st = time()
-        while (time() - st < timeout) and not all([i[0].ready() for i in tasks.values()]): pass
+        # Результаты забираем по мере готовности, у каждого решения свой таймаут
+        for variant in variants:
+            write_html_table(variant["report"], variant["table"], variant["wrongs"], variant["newest_list"],
+                             variant["task_count"], variant["cached_list"], live=True)
+        for _ in range(len(pending)):
+            try:
+                i, k, result = results.get(timeout=timeout + fetch_timeout)
+            except queue.Empty:
+                break
+
+            variant = variants[i]
+            del pending[i, k]
+            record_result(variant, k, result, pages, saved)
+            # Страница сама обновляется в браузере, пока идёт проверка
+            write_html_table(variant["report"], variant["table"], variant["wrongs"], variant["newest_list"],
+                             variant["task_count"], variant["cached_list"], live=True)
 
         print('Завершено!')
 
-        unfinished = [k for k, v in tasks.items() if not v[0].ready()]
-        pool.terminate()  # Принудительно завершаем все незавершенные задачи
+        # Сюда попадают только зависшие задачи (например, сайт не отвечает)
+        if pending: pool.terminate()
+
+        for i, k in pending:
+            variants[i]["table"].append(['#' + k, TIMEOUT, '⏰', '❔', variants[i]["links"][k]] + stats_cells(None)
+                                        + [variants[i]["predicted"].get(k)])
+            variants[i]["wrongs"].append('#' + k)
+
+        with span("хранилище"):
+            store.save(saved)
+
+        if workers: workers.close()
+        for variant in variants:
+            write_html_table(variant["report"], variant["table"], variant["wrongs"], variant["newest_list"],
+                             variant["task_count"], variant["cached_list"])
+            write_stats_json(os.path.splitext(variant["report"])[0] + ".json", variant["table"])
 
-        for k, data in tasks.items():
-            task, link = data
-            if not task.ready(): continue
+    return variants
 
-            problem_number = '#' + k
-            filename, raw_answer, correct, link = task.get()
 
-            if raw_answer != correct: wrongs.append(problem_number)
-            answer = raw_answer if raw_answer else '✖'
-            state = answer == correct
-            finished.append(problem_number[1:])
+def main(refresh=False):
+    print("Вывод осуществляется в", answers)
+
+    variant, = check_variants([(url, solution_folder, answers)], refresh)
 
-            table.append([problem_number, answer, state, correct, link])
+    print("Новые задания:", ", ".join(variant["newest_list"]))
 
-        for k in unfinished:
-            table.append(['#' + k, 'TIMEOUT', '⏰', '❔', tasks[k][1]])
-            wrongs.append('#' + k)
 
-        html_table = generate_html_table(table, wrongs, newest_list, task_count)
-        with open(answers, 'w', encoding='utf-8') as f:
-            f.write(html_table)
+def main_watch(refresh=False):
+    # Полная проверка один раз, дальше перепроверяем только сохранённый файл и правим его строку в отчёте
+    variant, = check_variants([(url, solution_folder, answers)], refresh)
+    links = problem_links(url)
+    saved = store.load()
+    workers = WarmPool(1, memory_limit=memory_limit) if warm_workers else None
 
-        print("Новые задания:", ", ".join(newest_list))
+    print(f"Слежу за папкой {solution_folder}, отчёт обновляется в {answers} (Ctrl+C - выход)")
+    try:
+        for names in watch.changes(solution_folder):
+            for filename in sorted(names):
+                k = solution_number(filename)
+                if k is None: continue
+                filepath = os.path.join(solution_folder, filename)
+                if not links.get(k) or not os.path.exists(filepath): continue
+
+                st = time()
+                variant["links"][k] = links[k]
+                variant["hashes"][k] = store.solution_hash(filepath, k)
+                if filename.endswith(".txt"):
+                    result = filename, read_txt_answer(filepath), None
+                else:
+                    try:
+                        result = (run_solution_warm(workers, solution_folder, filename) if workers
+                                  else run_solution(solution_folder, filename))
+                    except SolutionCrashed as crash:
+                        result = crash
+
+                variant["table"][1:] = [row for row in variant["table"][1:] if row[0] != '#' + k]
+                variant["wrongs"][:] = [i for i in variant["wrongs"] if i != '#' + k]
+                variant["newest_list"][:] = [i for i in variant["newest_list"] if i != k] + [k]
+                variant["cached_list"][:] = [i for i in variant["cached_list"] if i != k]
+
+                pages = fetch_all([links[k]], ttl=0) if not saved["answers"].get(links[k]) else {}
+                record_result(variant, k, result, pages, saved)
+                store.save(saved)
+                write_html_table(answers, variant["table"], variant["wrongs"], variant["newest_list"],
+                                 variant["task_count"], variant["cached_list"], live=True)
+
+                row = variant["table"][-1]
+                state = {True: '\033[32m✔', False: '\033[31m✖'}.get(row[2], '\033[34m' + str(row[2]))
+                print(f" #{k}: {state}\033[0m {row[1]} ({time() - st:.2f} с)")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if workers: workers.close()
+
+
+def main_batch(batch_file, refresh=False):
+    # Каждая строка файла: "<ссылка на вариант> <папка с решениями>"
+    jobs = []
+    with open(batch_file, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith('#'): continue
+            list_url, folder = line.strip().split(maxsplit=1)
+            jobs.append((list_url, folder, os.path.join(folder, answers)))
+
+    variants = check_variants(jobs, refresh)
+
+    with open(summary, 'w', encoding='utf-8') as f:
+        f.writelines(generate_summary_table(variants))
+    print("Сводка записана в", summary)
 
 
 if __name__ == '__main__':
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Проверка решений по ответам с сайта")
+    parser.add_argument("--batch", metavar="FILE", help="проверить сразу несколько учеников по списку из файла")
+    parser.add_argument("--watch", action="store_true", help="перепроверять решение сразу после сохранения")
+    parser.add_argument("--refresh", action="store_true", help="заново прочитать варианты с сайта")
+    parser.add_argument("--bundle", metavar="ФАЙЛ", help="брать страницы из архива bundle.py, а не из сети")
+    parser.add_argument("--trace", action="store_true", help=f"замерить время стадий и записать в {trace_file}")
+    parser.add_argument("--profile", metavar="СТАДИЯ", help="прогнать стадию через cProfile")
+    arguments = parser.parse_args()
+
+    if arguments.bundle: web.use_bundle(arguments.bundle)
+    if arguments.batch:
+        main_batch(arguments.batch, arguments.refresh)
+    elif arguments.watch:
+        main_watch(arguments.refresh)
+    else:
+        main(arguments.refresh)
+
+    web.report()
+    finish()
@@ -1,18 +1,49 @@
+import os
 import sys
 
 download_folder = "files"
 solution_folder = "solutions"
+blob_folder = os.path.join(download_folder, ".blobs")  # Все вложения по хэшу; в папки задач попадают жёсткими ссылками
 url = "https://inf-ege.sdamgia.ru/test?id=14688067&nt=True&pub=False"  # Задачи
 
 answers = "answers.html"    # Файл с таблицей правильных ответов
+summary = "summary.html"    # Сводная таблица при проверке нескольких учеников (check.py --batch)
 timeout = 10                # Макс время на выполнение задач
+results_file = "results.json"   # Сохранённые результаты проверки (перепроверяются только изменённые решения)
+warm_workers = True             # Запускать решения в заранее запущенных интерпретаторах
+memory_limit = 2 * 1024 ** 3    # Макс память на решение в байтах (только Linux/macOS)
+pool_size = None                # Сколько решений запускать одновременно (None - по числу ядер)
+
+bundle_file = None              # Архив варианта для работы без интернета (собирается bundle.py), None - сеть
+manifest_folder = ".variants"   # Сохранённые описания вариантов (задачи, ссылки, условия, файлы)
+
+request_rate = 20               # Макс запросов к сайту в секунду (на 429 и 5xx скорость снижается сама)
+request_retries = 3             # Сколько раз повторять запрос при сбое
+
+cache_folder = ".cache"         # Папка для сохранённых страниц сайта
+cache_ttl = 60 * 60             # Сколько секунд страница считается свежей
+cache_size = 50 * 1024 * 1024   # Макс размер кэша в байтах
+
+convert_data = True             # Переводить скачанные файлы с числами в .npy, который решение грузит мгновенно
+simple_tasks = []               # Номера задач, для которых auto.py без вопросов создаёт .txt с ответом, а не .py
+overwrite = "no"                # Что auto.py без вопросов делает с уже существующими файлами: yes - заменить, no - оставить
+
+trace_file = "trace.json"       # Куда писать замеры стадий (--trace или TRACE=1), открывается в chrome://tracing
 
 
 def is_debug(): return "checker" not in sys.argv
 
 
-def debug_print(*messages: str, sep=" ", end="\n"):
-    if is_debug(): print("[\033[33m⚠\033[0m]\033[37m " + sep.join(map(str, messages)) + "\033[0m", end=end)
+def is_tracing(): return is_debug() and ("--trace" in sys.argv or bool(os.environ.get("TRACE")))
+
 
+def profiled_stage():
+    # Стадия, которую надо прогнать через cProfile: --profile=СТАДИЯ или PROFILE=СТАДИЯ
+    for i, arg in enumerate(sys.argv):
+        if arg.startswith("--profile="): return arg.split("=", 1)[1]
+        if arg == "--profile" and i + 1 < len(sys.argv): return sys.argv[i + 1]
+    return os.environ.get("PROFILE") if is_debug() else None
 
 
+def debug_print(*messages: str, sep=" ", end="\n"):
+    if is_debug(): print("[\033[33m⚠\033[0m]\033[37m " + sep.join(map(str, messages)) + "\033[0m", end=end)
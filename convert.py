@@ -0,0 +1,136 @@
+import os
+import sys
+import itertools
+from array import array
+
+from disk import atomic_file
+
+# Файлы с данными один раз переводятся в .npy (формат NumPy: заголовок + сырые числа подряд),
+# чтобы решение не разбирало их текст при каждом запуске, а отображало в память
+
+version = 2  # Меняется, когда меняется разбор файлов - старые .npy тогда строятся заново
+npy_magic = b"\x93NUMPY\x01\x00"
+int64_limit = 2 ** 63
+
+# Вставляется в шаблон решения: работает и с NumPy, и без него (тогда - memoryview по mmap)
+loader_source = '''def load(path):
+    # Данные из .npy без разбора текста: файл отображается в память
+    try:
+        import numpy
+        return numpy.load(path, mmap_mode="r")
+    except ImportError:
+        import ast, mmap
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        size = int.from_bytes(data[8:10], "little")
+        header = ast.literal_eval(data[10:10 + size].decode("latin1"))
+        values = memoryview(data)[10 + size:].cast("q" if header["descr"] == "<i8" else "d")
+        if len(header["shape"]) == 1: return values
+        columns = header["shape"][1]
+
+        class Rows:  # rows[i] - строка таблицы, срез без копирования
+            def __len__(self): return len(values) // columns
+
+            def __getitem__(self, i):
+                if i < 0: i += len(self)
+                if not 0 <= i < len(self): raise IndexError(i)
+                return values[i * columns:(i + 1) * columns]
+        return Rows()
+'''
+
+
+def _number(text):
+    # int, если это целое, иначе float; ValueError - не число
+    try:
+        value = int(text)
+        return value if -int64_limit <= value < int64_limit else float(value)
+    except ValueError:
+        return float(text)
+
+
+def _pack(rows):
+    # rows - строки из чисел; None, если таблица не прямоугольная.
+    # Шапка в таблицу не входит: первая строка другой длины ("N" перед парами в 27-х, "N S" в 26-х)
+    # или одно число, равное количеству остальных строк ("N", а за ним N чисел по одному в строке)
+    values, columns, count = array("q"), None, 0
+    rows = (row for row in rows if row)
+    first = next(rows, None)
+    if first is None: return None
+    second = next(rows, None)
+    if second is None or len(second) == len(first):
+        rows = itertools.chain([first], [second] if second else [], rows)
+        header = []
+    else:
+        rows = itertools.chain([second], rows)
+        header = first
+
+    for row in rows:
+        if columns is None: columns = len(row)
+        if len(row) != columns: return None
+        if values.typecode == "q" and not all(isinstance(v, int) for v in row):
+            values = array("d", values)  # Встретилось дробное - дальше всё храним как float
+        values.extend(row)
+        count += 1
+    if not values: return None
+
+    if not header and columns == 1 and count > 1 and first[0] == count - 1 and isinstance(first[0], int):
+        header, values, count = first, values[1:], count - 1
+
+    if sys.byteorder == "big": values.byteswap()
+    return values, "<i8" if values.typecode == "q" else "<f8", (count,) if columns == 1 else (count, columns), header
+
+
+def _txt_rows(path):
+    with open(path, encoding="utf-8", errors="strict") as f:
+        for line in f:
+            parts = line.replace(',', ' ').replace(';', ' ').split()
+            try:
+                yield list(map(int, parts))  # Обычно там только целые - так быстрее
+            except ValueError:
+                yield [_number(i) for i in parts]
+
+
+def _xlsx_rows(path):
+    # Первый лист без openpyxl: все ячейки должны быть числами (строки из sharedStrings не поддерживаем)
+    import zipfile
+    from xml.etree.ElementTree import iterparse
+
+    try:
+        book = zipfile.ZipFile(path)
+    except zipfile.BadZipFile as e:
+        raise ValueError(e)
+
+    with book, book.open("xl/worksheets/sheet1.xml") as sheet:
+        row = []
+        for _, element in iterparse(sheet):
+            tag = element.tag.rsplit('}', 1)[-1]
+            if tag == "c":
+                value = next((child.text for child in element if child.tag.endswith("}v")), None)
+                if value is None or element.get("t") not in (None, "n"): raise ValueError(element.get("r"))
+                row.append(_number(value))
+            elif tag == "row":
+                yield row
+                row = []
+                element.clear()  # Прочитанные строки в памяти не держим
+
+
+def to_npy(source, target, extension=None):
+    # Переводит .txt/.xlsx с числами в target (.npy) и возвращает шапку ([] - её нет); None - это не таблица чисел
+    extension = (extension or os.path.splitext(source)[1]).lower()
+    rows = {".txt": _txt_rows, ".xlsx": _xlsx_rows}.get(extension)
+    if rows is None: return None
+
+    try:
+        packed = _pack(rows(source))
+    except (ValueError, OverflowError, UnicodeDecodeError, KeyError, OSError):
+        return None
+    if packed is None: return None
+
+    values, descr, shape, first_row = packed
+    header = repr({"descr": descr, "fortran_order": False, "shape": shape}).encode("latin1")
+    header += b" " * (-(len(npy_magic) + 2 + len(header) + 1) % 64) + b"\n"  # Данные выравниваются на 64 байта
+
+    with atomic_file(target, 'wb') as f:
+        f.write(npy_magic + len(header).to_bytes(2, "little") + header)
+        values.tofile(f)
+    return first_row
@@ -0,0 +1,36 @@
+import os
+import threading
+from contextlib import contextmanager
+
+
+def anchored(path):
+    # Пути из config.py относительные; модули переводят их в абсолютные при импорте,
+    # чтобы кэш, хранилище и отчёты не зависели от текущей папки
+    return os.path.abspath(path)
+
+
+@contextmanager
+def atomic_path(path):
+    # Временное имя рядом с path: то, что туда положили, подменяет path одним os.replace,
+    # читатель видит либо старый файл, либо новый целиком; при ошибке временный файл удаляется
+    temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        yield temp
+        os.replace(temp, path)
+    except BaseException:
+        try:
+            if os.path.exists(temp): os.remove(temp)
+        except OSError:
+            pass
+        raise
+
+
+@contextmanager
+def atomic_file(path, mode='w', **kwargs):
+    with atomic_path(path) as temp, open(temp, mode, **kwargs) as f:
+        yield f
+
+
+def write_atomic(path, data: bytes):
+    with atomic_file(path, 'wb') as f:
+        f.write(data)
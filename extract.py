@@ -0,0 +1,138 @@
+import re
+from functools import lru_cache
+from collections import namedtuple
+
+Answer = namedtuple("Answer", "answer method confidence")
+Description = namedtuple("Description", "text paragraphs tables formulas attachments")
+
+sol_start = re.compile(r"<div[^>]*\bid=[\"']?sol\d+[\"'\s>]")
+
+
+@lru_cache(maxsize=None)
+def _bs4():
+    # bs4 (и lxml) грузятся при первом разборе, а не при импорте: запуску без разбора они не нужны
+    from bs4 import BeautifulSoup, SoupStrainer
+    try:
+        import lxml  # noqa: F401 - если есть, разбор заметно быстрее
+        parser = "lxml"
+    except ImportError:
+        parser = "html.parser"
+
+    # Из всей страницы строим дерево только для нужных кусков
+    strainers = {"sol": SoupStrainer("div", id=re.compile(r"^sol\d+$")), "center": SoupStrainer("center")}
+    return BeautifulSoup, parser, strainers
+
+
+def sensible_text(nonsense_text: str):
+    return re.sub(r'[^a-zA-Zа-яА-Я0-9ёЁ.\-+=?!/\\ ]', '', nonsense_text)
+
+
+def clear(correct):
+    return ' '.join(re.findall(r"[\da-z]+", correct)) if not correct.isalpha() else correct
+
+
+def extract_answer(page):
+    # Всё, что до блока с решением, можно даже не токенизировать
+    BeautifulSoup, parser, strainers = _bs4()
+    start = sol_start.search(page)
+    sol = BeautifulSoup(page[start.start():] if start else page, parser, parse_only=strainers["sol"]).find("div")
+    assert sol, ValueError("ОЙ! Решение на странице не найдено!")
+
+    datablob = sol.text.lower()
+    le = datablob.rfind("ответ") + 6
+    ri = datablob.find(".", le)
+    if ri == -1: ri = len(datablob)
+
+    if le == 5:
+        # Слова "ответ" нет - надеемся, что ответ стоит в самом конце
+        method, confidence = "last_word", 0.5
+        correct = datablob.split()[-1].strip('\n. ')
+    else:
+        method, confidence = "answer_word", 1.0
+        correct = datablob[le:ri].strip()
+    correct = correct.replace(' ', '').replace('—', '')
+
+    # Ответы - латиница или числа; всё прочее ("см. таблицу", "(12; 5)") ищем в блоке ниже
+    if not re.match(r"[a-z]", correct) and not correct.isnumeric():
+        paragraphs = BeautifulSoup(page, parser, parse_only=strainers["center"]).select('center > p')
+        if paragraphs:
+            method, confidence = "center", 0.7
+            correct = paragraphs[0].get_text('\n').lower()
+        else:
+            confidence = 0.2
+
+    return Answer(clear(correct), method, confidence)
+
+
+def _is_attachment(tag):
+    return tag.get("target") == "_blank" or "/get_file" in (tag.get("src") or "")
+
+
+def extract_description(pbody):
+    # Один проход по уже разобранному телу задачи. Абзац - всё от <p> до следующего <p> (на сайте абзацы
+    # часто не закрыты или вложены друг в друга); текст берётся, только если он внутри последнего начатого <p>
+    from bs4 import NavigableString, CData, Tag
+
+    paragraphs = []  # (обычный ли абзац, куски текста)
+    tables, formulas, attachments = [], [], []
+    current = cells = None
+    cell_parts = {}
+
+    for node in pbody.descendants:
+        if isinstance(node, Tag):
+            if node.name == "p":
+                current = node
+                # Обычный абзац - <p> без атрибутов или <p class="left_margin">, прочие (формулы по центру,
+                # подписи) в текст не идут, но отделяют следующий абзац
+                paragraphs.append((node.attrs in ({}, {"class": ["left_margin"]}), []))
+            elif node.name == "table":
+                tables.append([])
+            elif node.name == "tr" and tables:
+                cells = []
+                tables[-1].append(cells)
+            elif node.name in ("td", "th") and cells is not None:
+                cell_parts[id(node)] = []
+                cells.append(cell_parts[id(node)])
+            elif node.name == "img" and "tex" in node.get("class", ()):
+                formulas.append(node.get("alt", ""))
+            if _is_attachment(node):
+                href = node.get("href") if node.get("href") is not None else node.get("src")
+                attachments.append({"url": href, "name": node.get_text()})
+        elif type(node) in (NavigableString, CData):
+            in_paragraph, in_cell = False, False
+            for parent in node.parents:
+                if not in_cell and id(parent) in cell_parts:
+                    cell_parts[id(parent)].append(node)
+                    in_cell = True
+                if parent is current:
+                    in_paragraph = True
+                if parent is pbody: break
+            if in_paragraph:
+                paragraphs[-1][1].append(node)
+
+    indent_next = False
+    description = ""
+    texts = []
+    for simple, parts in paragraphs:
+        text = "".join(parts)
+        if not text:
+            indent_next = True
+            continue
+
+        if indent_next:
+            indent_next = False
+            description += '\n'
+
+        if simple:
+            description += text + ' '
+        else:
+            indent_next = False if description.endswith('\n') else True
+        texts.append(" ".join(text.split()))
+
+    return Description(
+        text=re.sub(r' +', ' ', sensible_text(description)).strip('\n '),
+        paragraphs=texts,
+        tables=[[[" ".join("".join(cell).split()) for cell in row] for row in table] for table in tables],
+        formulas=formulas,
+        attachments=attachments,
+    )
@@ -0,0 +1,92 @@
+import os
+import sys
+import json
+import hashlib
+from time import time
+
+import attachments
+from config import manifest_folder, url
+from disk import anchored, atomic_file
+from extract import extract_description
+from tracing import traced
+from web import get_text
+
+version = 2  # Меняется, когда меняется формат - старые описания тогда строятся заново
+
+manifest_path = anchored(manifest_folder)
+
+
+@traced("описание")
+def parse_description(pbody):
+    return extract_description(pbody)
+
+
+@traced("список задач")
+def build(list_url, headers=None, refresh=False):
+    # Страница списка качается и разбирается один раз: номер задачи -> номер на сайте, ссылка, условие, файлы.
+    # refresh - спросить сайт, а не брать страницу из кэша (ETag/Last-Modified: неизменённая не качается заново)
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(get_text(list_url, headers=headers, ttl=0 if refresh else None), "html.parser")
+
+    prob_list = soup.find("div", class_="prob_list")
+    assert prob_list, ValueError("ОЙ! Укажите ссылку на СПИСОК задач, а не на одну задачу")
+
+    site = list_url[:list_url.find('/', list_url.find('//') + 2)]
+    tasks = {}
+    for prob_item in prob_list.find_all("div", class_="prob_num"):
+        pbody = prob_item.find_next().find("div", class_="pbody")
+        nums = prob_item.find_next().find("span", class_="prob_nums")
+
+        description = parse_description(pbody) if pbody else None
+
+        files = []
+        for file in description.attachments if description else ():
+            if any(known["url"] == site + file["url"] for known in files): continue
+            digest, content_type = attachments.known(site + file["url"]) or (None, None)
+            files.append({"url": site + file["url"], "name": file["name"], "hash": digest, "type": content_type})
+
+        tasks[prob_item.get_text(strip=True)] = {
+            "id": nums.find('a').get_text(strip=True) if nums else None,
+            "link": site + nums.find('a')["href"] if nums else None,
+            "description": description.text if description else None,
+            "paragraphs": description.paragraphs if description else [],
+            "tables": description.tables if description else [],
+            "formulas": description.formulas if description else [],
+            "files": files,
+        }
+
+    return {"version": version, "url": list_url, "created": time(), "tasks": tasks}
+
+
+def path_for(list_url):
+    return os.path.join(manifest_path, hashlib.sha1(list_url.encode("utf-8")).hexdigest() + ".json")
+
+
+def save(manifest):
+    os.makedirs(manifest_path, exist_ok=True)
+    with atomic_file(path_for(manifest["url"]), 'w', encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+
+
+def load(list_url, headers=None, refresh=False):
+    # Описание варианта строится один раз и дальше читается с диска; refresh - перечитать сайт
+    if not refresh:
+        try:
+            with open(path_for(list_url), encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("version") == version:
+                return manifest
+        except (OSError, ValueError):
+            pass
+
+    manifest = build(list_url, headers, refresh)
+    save(manifest)
+    return manifest
+
+
+if __name__ == "__main__":
+    # python manifest.py [ССЫЛКА...] - заново построить описания вариантов (по умолчанию - из config.url)
+    for list_url in sys.argv[1:] or [url]:
+        manifest = load(list_url, refresh=True)
+        print(f"{list_url}: {len(manifest['tasks'])} задач -> {path_for(list_url)}")
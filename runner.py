@@ -0,0 +1,274 @@
+import io
+import os
+import sys
+import json
+import queue
+import runpy
+import tempfile
+import threading
+import subprocess
+import importlib
+from time import time
+
+try:
+    import resource  # Только на Linux/macOS: без него лимиты просто не ставятся
+except ImportError:
+    resource = None
+
+preload = ("itertools", "functools", "math", "re", "string", "collections", "fractions", "decimal")
+max_runs = 100  # После стольких запусков интерпретатор всё равно перезапускается
+
+
+class SolutionCrashed(Exception):
+    # Интерпретатор решения убит сигналом (segfault, нехватка памяти) - это не то же самое, что не уложиться во время
+    pass
+
+
+class WarmWorker:
+    def __init__(self, memory_limit=None):
+        self.memory_limit = memory_limit
+        self.process = None
+        self._lines = queue.Queue()
+        # Вывод решения идёт сразу в файл (на уровне дескриптора): он цел, даже если решение вызвало os._exit
+        fd, self.output = tempfile.mkstemp(prefix="warm-", suffix=".out")
+        os.close(fd)
+        self._start()
+
+    def _start(self):
+        command = [sys.executable, os.path.abspath(__file__)]
+        if self.memory_limit: command.append(str(self.memory_limit))
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        text=True, encoding="UTF-8", bufsize=1)
+        self.runs = 0
+        self._lines = queue.Queue()
+        threading.Thread(target=self._read, args=(self.process, self._lines), daemon=True).start()
+
+    @staticmethod
+    def _read(process, lines):
+        for line in process.stdout:
+            lines.put(line)
+        lines.put(None)  # Процесс умер
+
+    def recycle(self):
+        self._stop()
+        self._start()
+
+    def _stop(self):
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+
+    def close(self):
+        self._stop()
+        if os.path.exists(self.output): os.remove(self.output)
+
+    def _read_output(self):
+        with open(self.output, encoding="UTF-8", errors="replace") as f:
+            return f.read()
+
+    def run(self, path, cwd, timeout):
+        # Возвращает (вывод, статистика); вывод None - не уложились во время, SolutionCrashed - убит сигналом.
+        # Решение, само завершившее интерпретатор (os._exit), считается отработавшим - как и при обычном запуске
+        st = time()
+        try:
+            self.process.stdin.write(json.dumps({"path": path, "cwd": cwd, "timeout": timeout,
+                                                 "output": self.output}) + '\n')
+            self.process.stdin.flush()
+            line = self._lines.get(timeout=timeout)
+        except queue.Empty:
+            self.recycle()
+            return None, empty_stats(time() - st)
+        except OSError:
+            line = None
+
+        if line is None:
+            self._stop()
+            code, wall = self.process.returncode, time() - st
+            stdout = self._read_output()
+            self._start()
+            if code < 0: raise SolutionCrashed(f"интерпретатор убит сигналом {-code} через {wall:.2f} с")
+            return stdout, empty_stats(wall)
+
+        reply = json.loads(line)
+        stdout = self._read_output()
+        self.runs += 1
+        if reply["recycle"] or self.runs >= max_runs:
+            self.recycle()
+        return stdout, reply["stats"]
+
+
+class WarmPool:
+    def __init__(self, size=None, memory_limit=None):
+        self.size = size or os.cpu_count() or 1
+        self._free = queue.Queue()
+        self._workers = [WarmWorker(memory_limit) for _ in range(self.size)]
+        for worker in self._workers:
+            self._free.put(worker)
+
+    def run(self, path, cwd, timeout):
+        worker = self._free.get()
+        try:
+            return worker.run(path, cwd, timeout)
+        finally:
+            self._free.put(worker)
+
+    def close(self):
+        for worker in self._workers:
+            worker.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def empty_stats(wall):
+    return {"wall": wall, "user": None, "sys": None, "rss": None}
+
+
+def _maxrss(usage):
+    # ru_maxrss в килобайтах, а на macOS - в байтах
+    return usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+def _reset_peak_rss():
+    # Linux умеет сбрасывать пик памяти процесса, тогда он считается для каждого запуска отдельно
+    try:
+        with open("/proc/self/clear_refs", 'w') as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+
+
+def measure_run(command, cwd, timeout):
+    # Как subprocess.run, но ещё собирает время ЦП и пик памяти дочернего процесса (через wait4)
+    st = time()
+    if not hasattr(os, "wait4"):
+        try:
+            stdout = subprocess.run(command, cwd=cwd, timeout=timeout, stdin=subprocess.DEVNULL,
+                                    capture_output=True, text=True, encoding="UTF-8").stdout
+        except subprocess.TimeoutExpired:
+            stdout = None
+        return stdout, empty_stats(time() - st)
+
+    process = subprocess.Popen(command, cwd=cwd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, text=True, encoding="UTF-8")
+    output = []
+    reader = threading.Thread(target=lambda: output.append(process.stdout.read()), daemon=True)
+    reader.start()
+    reader.join(timeout)
+    timed_out = reader.is_alive()
+    if timed_out:
+        process.kill()
+
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    reader.join()
+    process.stdout.close()
+    if process.returncode < 0 and not timed_out:
+        raise SolutionCrashed(f"решение убито сигналом {-process.returncode} через {time() - st:.2f} с")
+
+    stats = {"wall": time() - st, "user": usage.ru_utime, "sys": usage.ru_stime, "rss": _maxrss(usage)}
+    return (None if timed_out else output[0]), stats
+
+
+def _limit(kind, value):
+    if resource is None: return
+    try:
+        resource.setrlimit(kind, (value, resource.getrlimit(kind)[1]))
+    except (ValueError, OSError):
+        pass
+
+
+def serve():
+    # Канал к родителю - копия stdout; сам stdout уводим в никуда, чтобы решение его не испортило.
+    # stderr решения, как и при обычном запуске, никому не нужен
+    channel = os.fdopen(os.dup(1), 'w', encoding="UTF-8")
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.dup2(devnull, 2)
+    stdin = sys.stdin
+
+    if len(sys.argv) > 1 and resource is not None:
+        _limit(resource.RLIMIT_AS, int(sys.argv[1]))
+
+    for name in preload:
+        importlib.import_module(name)
+
+    base_modules = set(sys.modules)
+    base_path = list(sys.path)
+    base_cwd = os.getcwd()
+    # Настройки интерпретатора, которые решения любят менять: следующее решение должно видеть исходные
+    base_recursion = sys.getrecursionlimit()
+    base_digits = sys.get_int_max_str_digits() if hasattr(sys, "get_int_max_str_digits") else None
+
+    for line in stdin:
+        request = json.loads(line)
+        recycle = False
+
+        # Решению - настоящие файлы, как в обычном процессе: у них есть .buffer и fileno().
+        # Запись идёт без буфера, поэтому напечатанное не теряется при os._exit
+        output = os.open(request["output"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+        os.dup2(output, 1)
+        os.close(output)
+        stdout = io.TextIOWrapper(io.FileIO(1, 'w', closefd=False), encoding="UTF-8", write_through=True)
+        solution_stdin = open(os.devnull, encoding="UTF-8")
+
+        if resource is not None:
+            used = resource.getrusage(resource.RUSAGE_SELF)
+            _limit(resource.RLIMIT_CPU, int(used.ru_utime + used.ru_stime + request["timeout"]) + 1)
+
+        os.chdir(request["cwd"])
+        sys.path[:] = [os.path.dirname(request["path"])] + base_path[1:]
+        sys.argv = [request["path"], "checker"]
+        sys.stdin, sys.stdout, sys.stderr = solution_stdin, stdout, sys.__stderr__
+
+        exact_rss = resource is not None and _reset_peak_rss()
+        before = resource.getrusage(resource.RUSAGE_SELF) if resource is not None else None
+        st = time()
+        try:
+            runpy.run_path(request["path"], run_name="__main__")
+        except SystemExit:
+            pass
+        except MemoryError:
+            recycle = True
+        except BaseException:
+            pass
+        stats = empty_stats(time() - st)
+        if resource is not None:
+            after = resource.getrusage(resource.RUSAGE_SELF)
+            stats["user"] = after.ru_utime - before.ru_utime
+            stats["sys"] = after.ru_stime - before.ru_stime
+            stats["rss"] = _peak_rss() if exact_rss else _maxrss(after)  # Иначе - пик за всю жизнь процесса
+
+        try:
+            stdout.flush()
+        except (OSError, ValueError):
+            pass  # Решение само закрыло stdout
+        solution_stdin.close()
+        sys.stdin, sys.stdout, sys.stderr = stdin, sys.__stdout__, sys.__stderr__
+        os.dup2(devnull, 1)
+        os.chdir(base_cwd)
+        sys.path[:] = base_path
+        sys.setrecursionlimit(base_recursion)
+        if base_digits is not None: sys.set_int_max_str_digits(base_digits)
+        for name in set(sys.modules) - base_modules:
+            module_file = getattr(sys.modules[name], "__file__", None) or ""
+            if os.path.dirname(os.path.abspath(module_file)) == os.path.dirname(request["path"]):
+                del sys.modules[name]  # Модули ученика каждый раз загружаются заново
+
+        channel.write(json.dumps({"stats": stats, "recycle": recycle}) + '\n')
+        channel.flush()
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,58 @@
+import os
+import json
+import hashlib
+
+from config import results_file, download_folder
+from disk import anchored, atomic_file
+
+history_size = 5  # Сколько последних запусков учитывать в прогнозе
+
+results_path = anchored(results_file)
+
+
+def load():
+    try:
+        with open(results_path, encoding="utf-8") as f:
+            store = json.load(f)
+    except (OSError, ValueError):
+        store = {}
+
+    store.setdefault("tasks", {})    # Путь к решению -> хэш решения, ответ, статистика
+    store.setdefault("answers", {})  # Ссылка на решение -> правильный ответ
+    store.setdefault("history", {})  # Путь к решению -> время последних запусков
+    return store
+
+
+def save(store):
+    with atomic_file(results_path, 'w', encoding="utf-8") as f:
+        json.dump(store, f, ensure_ascii=False, indent=1)
+
+
+def solution_hash(filepath, problem_number):
+    # Решение зависит и от своих файлов, поэтому хэшируем их вместе с кодом
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        digest.update(f.read())
+
+    sub_folder = os.path.join(download_folder, f"Задача номер {problem_number}")
+    if os.path.isdir(sub_folder):
+        for name in sorted(os.listdir(sub_folder)):
+            path = os.path.join(sub_folder, name)
+            if not os.path.isfile(path): continue
+            digest.update(name.encode("utf-8"))
+            digest.update(str(os.path.getsize(path)).encode())
+            digest.update(str(os.path.getmtime(path)).encode())
+
+    return digest.hexdigest()
+
+
+def remember_runtime(store, filepath, wall):
+    history = store["history"].setdefault(filepath, [])
+    history.append(wall)
+    del history[:-history_size]
+
+
+def predict_runtime(store, filepath, default):
+    # Неизвестное решение считаем самым долгим (default), чтобы оно не оказалось в хвосте очереди
+    history = store["history"].get(filepath)
+    return sum(history) / len(history) if history else default
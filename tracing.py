@@ -0,0 +1,80 @@
+import os
+import json
+import threading
+from time import perf_counter
+from functools import wraps
+from contextlib import contextmanager
+from collections import defaultdict
+
+from config import trace_file, is_tracing, profiled_stage, debug_print
+from disk import anchored
+
+events = []
+profiles = []
+_lock = threading.Lock()
+_start = perf_counter()
+
+trace_path = anchored(trace_file)
+
+
+@contextmanager
+def span(name, **args):
+    # Замер одной стадии; без --trace и --profile почти ничего не стоит
+    tracing, profiling = is_tracing(), profiled_stage() == name
+    if not tracing and not profiling:
+        yield
+        return
+
+    if profiling: import cProfile
+    profile = cProfile.Profile() if profiling else None
+    st = perf_counter()
+    if profile: profile.enable()
+    try:
+        yield
+    finally:
+        if profile: profile.disable()
+        duration = perf_counter() - st
+        with _lock:
+            if profile: profiles.append(profile)
+            if tracing:
+                events.append({
+                    "name": name, "ph": "X", "pid": os.getpid(), "tid": threading.get_ident(),
+                    "ts": (st - _start) * 1e6, "dur": duration * 1e6,
+                    "args": {k: str(v) for k, v in args.items()},
+                })
+
+
+def traced(name, arg=None):
+    # Декоратор: вся функция - одна стадия; arg - номер аргумента, который подписать у отрезка (например, задача)
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, **({"arg": args[arg]} if arg is not None and len(args) > arg else {})):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def finish():
+    # Пишет файл для chrome://tracing и печатает сводку по стадиям
+    if events:
+        with open(trace_path, 'w', encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+
+        totals = defaultdict(list)
+        for event in events:
+            totals[event["name"]].append(event["dur"] / 1e6)
+
+        debug_print(f"Замеры записаны в {trace_path}")
+        debug_print(f"{'Стадия':20} | {'Раз':>5} | {'Всего, с':>9} | {'Среднее, с':>10} | {'Макс, с':>8}")
+        for name, durations in sorted(totals.items(), key=lambda item: -sum(item[1])):
+            debug_print(f"{name:20} | {len(durations):5} | {sum(durations):9.3f} | "
+                        f"{sum(durations) / len(durations):10.4f} | {max(durations):8.3f}")
+
+    if profiles:
+        import pstats
+
+        stats = pstats.Stats(*profiles)
+        stats.dump_stats(os.path.splitext(trace_path)[0] + ".prof")
+        debug_print(f"Профиль стадии {profiled_stage()!r}: {os.path.splitext(trace_path)[0]}.prof")
+        stats.sort_stats("cumulative").print_stats(15)
@@ -0,0 +1,77 @@
+import os
+import sys
+import select
+import struct
+from time import sleep
+
+IN_CLOSE_WRITE = 0x08
+IN_MOVED_TO = 0x80
+event_header = struct.Struct("iIII")
+
+poll_interval = 0.2  # Как часто проверять папку без inotify
+settle_time = 0.05   # Редактор часто пишет файл в несколько приёмов - ждём, пока всё уляжется
+
+
+def _inotify(folder):
+    if not sys.platform.startswith("linux"): return None
+    import ctypes
+    import ctypes.util
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = libc.inotify_init1(os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0: return None
+
+    if libc.inotify_add_watch(fd, os.fsencode(folder), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _read_events(fd):
+    names = set()
+    data = os.read(fd, 64 * 1024)
+    offset = 0
+    while offset < len(data):
+        _, _, _, length = event_header.unpack_from(data, offset)
+        offset += event_header.size
+        names.add(os.fsdecode(data[offset:offset + length].rstrip(b'\0')))
+        offset += length
+    return names
+
+
+def _watch_inotify(fd):
+    try:
+        while True:
+            select.select([fd], [], [])
+            names = _read_events(fd)
+            while select.select([fd], [], [], settle_time)[0]:
+                names |= _read_events(fd)
+            yield names
+    finally:
+        os.close(fd)
+
+
+def _snapshot(folder):
+    return {entry.name: entry.stat().st_mtime_ns for entry in os.scandir(folder) if entry.is_file()}
+
+
+def _watch_polling(folder):
+    before = _snapshot(folder)
+    while True:
+        sleep(poll_interval)
+        after = _snapshot(folder)
+        names = {name for name, mtime in after.items() if before.get(name) != mtime}
+        if names:
+            sleep(settle_time)
+            after = _snapshot(folder)
+            yield names
+        before = after
+
+
+def changes(folder):
+    # Бесконечно отдаёт множества имён файлов, изменённых в папке (inotify на Linux, иначе опрос)
+    fd = _inotify(folder)
+    return _watch_inotify(fd) if fd is not None else _watch_polling(folder)
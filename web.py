@@ -0,0 +1,317 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+from time import time, sleep, monotonic
+from bisect import bisect_left
+from collections import Counter
+
+from config import cache_folder, cache_ttl, cache_size, bundle_file, request_rate, request_retries, is_tracing, \
+    debug_print
+from disk import anchored, write_atomic
+from tracing import traced
+
+cache_path = anchored(cache_folder)
+
+fetch_workers = 8  # Сколько страниц качаем одновременно
+download_chunk = 64 * 1024  # Файлы пишутся на диск кусками, целиком в памяти не держатся
+request_timeout = 20  # Сколько ждать ответа сайта, с
+backoff = 0.5  # Пауза перед первым повтором, дальше растёт вдвое
+latency_buckets = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, float("inf"))  # Границы столбцов гистограммы, с
+
+# Одна сессия на процесс: соединения с сайтом переиспользуются (keep-alive)
+session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    # requests грузится при первом запросе: запуск, которому сеть не нужна (кэш, архив, --help), за него не платит
+    global session
+    with _session_lock:
+        if session is None:
+            import requests
+            session = requests.Session()
+            session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=fetch_workers))
+            session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=fetch_workers))
+    return session
+
+
+class TokenBucket:
+    # Не больше rate запросов в секунду; на 429/5xx скорость падает вдвое, на каждый удачный ответ - немного растёт
+    def __init__(self, rate, burst=None):
+        self.max_rate = self.rate = rate
+        self.burst = burst or max(1, rate)
+        self.tokens = self.burst
+        self.updated = monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            sleep(wait)
+
+    def slow_down(self):
+        with self._lock:
+            self.rate = max(self.max_rate / 16, self.rate / 2)
+            self.tokens = min(self.tokens, 0)
+
+    def speed_up(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+bucket = TokenBucket(request_rate)
+counters = Counter()  # "запросов", "повторов", "ошибок", "притормозили", а также коды ответов
+latencies = [0] * len(latency_buckets)  # Сколько ответов попало в каждый столбец гистограммы
+_stats_lock = threading.Lock()
+
+
+def _count(name, latency=None):
+    with _stats_lock:
+        counters[name] += 1
+        if latency is not None:
+            latencies[bisect_left(latency_buckets, latency)] += 1
+
+
+def request(url, **kwargs):
+    # session.get с ограничением скорости и повторами при сбоях сети, 429 и 5xx
+    client = get_session()
+    import requests
+
+    for attempt in range(request_retries + 1):
+        bucket.acquire()
+        st = monotonic()
+        try:
+            response = client.get(url, timeout=request_timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            _count("ошибок")
+            if attempt == request_retries: raise
+            bucket.slow_down()
+            _count("повторов")
+            sleep(backoff * 2 ** attempt)
+            continue
+
+        _count("запросов", monotonic() - st)
+        _count(response.status_code)
+        if response.status_code != 429 and response.status_code < 500:
+            bucket.speed_up()
+            return response
+
+        bucket.slow_down()
+        _count("притормозили")
+        if attempt == request_retries: return response
+        retry_after = response.headers.get("Retry-After", "")
+        response.close()
+        _count("повторов")
+        sleep(float(retry_after) if retry_after.isdigit() else backoff * 2 ** attempt)
+
+
+def report():
+    # Счётчики запросов и гистограмма задержек (печатается с --trace)
+    if not is_tracing() or not counters: return
+    debug_print("Запросы к сайту: " + ", ".join(f"{k}: {v}" for k, v in counters.items()) +
+                f"; скорость сейчас {bucket.rate:.1f}/с")
+    top = max(latencies) or 1
+    for limit, count in zip(latency_buckets, latencies):
+        if count: debug_print(f"  до {limit:>4} с | {'#' * max(1, round(30 * count / top)):30} {count}")
+
+
+# Открытый архив варианта (bundle.py): если он есть, страницы и файлы берутся из него, а не из сети
+bundle = None
+_bundle_index = {}
+_bundle_lock = threading.Lock()
+
+
+def use_bundle(path):
+    global bundle, _bundle_index
+    import zipfile
+
+    bundle = zipfile.ZipFile(path) if path else None
+    _bundle_index = json.loads(bundle.read("index.json")) if bundle else {}
+
+
+def _bundle_entry(url):
+    entry = _bundle_index.get(url)
+    assert entry, ValueError(f"ОЙ! В архиве нет {url}, соберите его заново (bundle.py)")
+    return entry
+
+
+_cache_lock = threading.Lock()
+_cache_total = None  # Байт в кэше сейчас; None - ещё не считали
+
+
+def _cache_key(url):
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def _load_meta(key):
+    try:
+        with open(os.path.join(cache_path, key + ".json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_meta(key, meta):
+    write_atomic(os.path.join(cache_path, key + ".json"), json.dumps(meta).encode("utf-8"))
+
+
+def _load_body(key):
+    try:
+        with open(os.path.join(cache_path, key + ".body"), 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _cache_entries():
+    # (когда использовалась, ключ, размер) каждой страницы в кэше
+    entries = []
+    for name in os.listdir(cache_path) if os.path.exists(cache_path) else ():
+        if not name.endswith(".body"): continue
+        key = name[:-len(".body")]
+        meta = _load_meta(key) or {}
+        try:
+            size = os.path.getsize(os.path.join(cache_path, name))
+        except OSError:
+            continue  # Уже удалён другим потоком
+        entries.append((meta.get("used", 0), key, size))
+    return entries
+
+
+def evict(limit=None):
+    # Удаляем давно не использованные страницы, пока кэш не влезет в limit байт
+    global _cache_total
+    limit = cache_size if limit is None else limit
+    entries = _cache_entries()
+    total = sum(size for _, _, size in entries)
+
+    for _, key, size in sorted(entries):
+        if total <= limit: break
+        for ext in (".body", ".json"):
+            try:
+                os.remove(os.path.join(cache_path, key + ext))
+            except OSError:
+                pass
+        total -= size
+
+    with _cache_lock:
+        _cache_total = total
+
+
+def _cache_grew(delta):
+    # Размер кэша ведём на ходу (по диску считаем один раз), а обходим его, только когда он перерос cache_size
+    global _cache_total
+    with _cache_lock:
+        if _cache_total is None:  # Обход уже видит только что записанную страницу
+            _cache_total = sum(size for _, _, size in _cache_entries())
+        else:
+            _cache_total += delta
+        over = _cache_total > cache_size
+    if over: evict()
+
+
+@traced("скачивание", arg=0)
+def get_text(url, headers=None, ttl=None, strict=False):
+    # strict - ответ с ошибкой (404, 5xx) поднимает исключение, а не возвращается как текст страницы
+    if bundle:
+        entry = _bundle_entry(url)
+        with _bundle_lock:
+            return bundle.read(entry["name"]).decode(entry["encoding"], errors="replace")
+
+    ttl = cache_ttl if ttl is None else ttl
+    key = _cache_key(url)
+    meta = _load_meta(key)
+    body = _load_body(key) if meta else None
+
+    if body is not None and time() - meta["fetched"] < ttl:
+        meta["used"] = time()
+        _save_meta(key, meta)
+        return body.decode(meta["encoding"], errors="replace")
+
+    request_headers = dict(headers or {})
+    if body is not None:
+        if meta.get("etag"): request_headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"): request_headers["If-Modified-Since"] = meta["last_modified"]
+
+    response = request(url, headers=request_headers)
+
+    if response.status_code == 304 and body is not None:
+        meta["fetched"] = meta["used"] = time()
+        _save_meta(key, meta)
+        return body.decode(meta["encoding"], errors="replace")
+
+    if not response.ok:
+        if strict: response.raise_for_status()
+        return response.text
+
+    os.makedirs(cache_path, exist_ok=True)
+    encoding = response.encoding or response.apparent_encoding or "utf-8"
+    write_atomic(os.path.join(cache_path, key + ".body"), response.content)
+    _save_meta(key, {
+        "url": url,
+        "encoding": encoding,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "fetched": time(),
+        "used": time(),
+    })
+    _cache_grew(len(response.content) - (len(body) if body is not None else 0))
+
+    return response.text
+
+
+def background(func, urls, *args):
+    # Возвращает {url: Future[func(url, *args)]}: повторы ссылок отбрасываются, вызывающий не ждёт
+    from concurrent.futures import ThreadPoolExecutor
+
+    executor = ThreadPoolExecutor(max_workers=fetch_workers)
+    futures = {u: executor.submit(func, u, *args) for u in dict.fromkeys(urls)}
+    executor.shutdown(wait=False)
+    return futures
+
+
+def fetch_all(urls, headers=None, ttl=None, strict=False):
+    # Возвращает {url: Future[str]}, страницы качаются в фоне и не блокируют вызывающего
+    return background(get_text, urls, headers, ttl, strict)
+
+
+@traced("вложение", arg=0)
+def download(url, path, headers=None):
+    # Качает файл во временный path + ".part" и атомарно переименовывает; прерванную загрузку докачивает
+    part = path + ".part"
+    if bundle:
+        entry = _bundle_entry(url)
+        with _bundle_lock, bundle.open(entry["name"]) as source, open(part, 'wb') as f:
+            shutil.copyfileobj(source, f, download_chunk)
+        os.replace(part, path)
+        return entry["type"]
+
+    request_headers = dict(headers or {})
+    done = os.path.getsize(part) if os.path.exists(part) else 0
+    if done: request_headers["Range"] = f"bytes={done}-"
+
+    with request(url, headers=request_headers, stream=True) as response:
+        if response.status_code == 416:  # Сервер не докачивает с этого места - начинаем заново
+            os.remove(part)
+            return download(url, path, headers)
+        response.raise_for_status()
+
+        with open(part, 'ab' if response.status_code == 206 else 'wb') as f:
+            for chunk in response.iter_content(download_chunk):
+                f.write(chunk)
+        content_type = response.headers.get("Content-Type", "")
+
+    os.replace(part, path)
+    return content_type
+
+
+if bundle_file: use_bundle(bundle_file)